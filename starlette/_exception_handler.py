@@ -13,53 +13,140 @@ ExceptionHandlers = dict[Any, ExceptionHandler]
 StatusHandlers = dict[int, ExceptionHandler]
 
 
+class ExceptionHandlerTable(ExceptionHandlers):
+    """
+    A mapping of exception classes onto handlers, which remembers the handler
+    resolved for each raised exception class until it is modified.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.resolved: dict[type[BaseException], ExceptionHandler | None] = {}
+
+    def lookup(self, cls: type[BaseException]) -> ExceptionHandler | None:
+        try:
+            return self.resolved[cls]
+        except KeyError:
+            handler = self.resolved[cls] = next((self[base] for base in cls.__mro__ if base in self), None)
+            return handler
+
+    def __setitem__(self, key: Any, value: ExceptionHandler) -> None:
+        super().__setitem__(key, value)
+        self.resolved.clear()
+
+    def __delitem__(self, key: Any) -> None:
+        super().__delitem__(key)
+        self.resolved.clear()
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+        self.resolved.clear()
+
+    def pop(self, *args: Any) -> Any:
+        self.resolved.clear()
+        return super().pop(*args)
+
+    def popitem(self) -> tuple[Any, ExceptionHandler]:
+        self.resolved.clear()
+        return super().popitem()
+
+    def setdefault(self, key: Any, default: ExceptionHandler) -> ExceptionHandler:
+        self.resolved.clear()
+        return super().setdefault(key, default)
+
+    def __ior__(self, other: Any) -> ExceptionHandlerTable:  # type: ignore[override,misc]
+        super().__ior__(other)
+        self.resolved.clear()
+        return self
+
+    def clear(self) -> None:
+        super().clear()
+        self.resolved.clear()
+
+
 def _lookup_exception_handler(exc_handlers: ExceptionHandlers, exc: Exception) -> ExceptionHandler | None:
+    if isinstance(exc_handlers, ExceptionHandlerTable):
+        return exc_handlers.lookup(type(exc))
     for cls in type(exc).__mro__:
         if cls in exc_handlers:
             return exc_handlers[cls]
     return None
 
 
-def wrap_app_handling_exceptions(app: ASGIApp, conn: Request | WebSocket) -> ASGIApp:
-    exception_handlers: ExceptionHandlers
-    status_handlers: StatusHandlers
-    try:
-        exception_handlers, status_handlers = conn.scope["starlette.exception_handlers"]
-    except KeyError:
-        exception_handlers, status_handlers = {}, {}
+class ResponseStartTracker:
+    """
+    Wraps `send`, to tell whether the response has started when an exception
+    is raised.
+    """
 
-    async def wrapped_app(scope: Scope, receive: Receive, send: Send) -> None:
-        response_started = False
+    __slots__ = ("send", "response_started")
 
-        async def sender(message: Message) -> None:
-            nonlocal response_started
+    def __init__(self, send: Send) -> None:
+        self.send = send
+        self.response_started = False
 
-            if message["type"] == "http.response.start":
-                response_started = True
-            await send(message)
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.response_started = True
+        await self.send(message)
 
-        try:
-            await app(scope, receive, sender)
-        except Exception as exc:
-            handler = None
 
-            if isinstance(exc, HTTPException):
-                handler = status_handlers.get(exc.status_code)
+_NO_HANDLERS: tuple[ExceptionHandlers, StatusHandlers] = ({}, {})
+
+
+def get_exception_handlers(scope: Scope) -> tuple[ExceptionHandlers, StatusHandlers]:
+    """
+    Return the handlers installed by the closest `ExceptionMiddleware`. This
+    must be read before calling the application, since a nested
+    `ExceptionMiddleware` replaces them in the scope.
+    """
+    return scope.get("starlette.exception_handlers", _NO_HANDLERS)
+
+
+async def handle_exception(
+    exc: Exception,
+    conn: Request | WebSocket,
+    handlers: tuple[ExceptionHandlers, StatusHandlers],
+    scope: Scope,
+    receive: Receive,
+    sender: ResponseStartTracker,
+) -> None:
+    """
+    Run the handler registered for `exc`, or re-raise it if there is none.
+    Only called once an exception is raised, so that the success path doesn't
+    pay for resolving handlers.
+    """
+    exception_handlers, status_handlers = handlers
+    handler = None
+
+    if isinstance(exc, HTTPException):
+        handler = status_handlers.get(exc.status_code)
+
+    if handler is None:
+        handler = _lookup_exception_handler(exception_handlers, exc)
 
-            if handler is None:
-                handler = _lookup_exception_handler(exception_handlers, exc)
+    if handler is None:
+        raise exc
 
-            if handler is None:
-                raise exc
+    if sender.response_started:
+        raise RuntimeError("Caught handled exception, but response already started.") from exc
 
-            if response_started:
-                raise RuntimeError("Caught handled exception, but response already started.") from exc
+    if is_async_callable(handler):
+        response = await handler(conn, exc)
+    else:
+        response = await run_in_threadpool(handler, conn, exc)
+    if response is not None:
+        await response(scope, receive, sender)
 
-            if is_async_callable(handler):
-                response = await handler(conn, exc)
-            else:
-                response = await run_in_threadpool(handler, conn, exc)
-            if response is not None:
-                await response(scope, receive, sender)
+
+def wrap_app_handling_exceptions(app: ASGIApp, conn: Request | WebSocket) -> ASGIApp:
+    handlers = get_exception_handlers(conn.scope)
+
+    async def wrapped_app(scope: Scope, receive: Receive, send: Send) -> None:
+        sender = ResponseStartTracker(send)
+        try:
+            await app(scope, receive, sender)
+        except Exception as exc:
+            await handle_exception(exc, conn, handlers, scope, receive, sender)
 
     return wrapped_app
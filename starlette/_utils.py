@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import functools
 import sys
-from collections.abc import Awaitable, Generator
+from collections.abc import Awaitable, Generator, Sequence
 from contextlib import AbstractAsyncContextManager, contextmanager
 from typing import Any, Callable, Generic, Protocol, TypeVar, overload
 
@@ -101,3 +101,37 @@ def get_route_path(scope: Scope) -> str:
         return path[len(root_path) :]
 
     return path
+
+
+def parse_accept_encoding(accept_encoding: str) -> dict[str, float]:
+    """
+    Parse an `Accept-Encoding` header into a mapping of content codings to q-values.
+    """
+    encodings: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[coding] = quality
+    return encodings
+
+
+@functools.lru_cache(maxsize=128)
+def negotiate_encodings(accept_encoding: str, available: Sequence[str]) -> tuple[str, ...]:
+    """
+    Return the `available` content codings that the client accepts, most preferred
+    first. Codings with the same q-value keep the order of `available`.
+    """
+    accepted = parse_accept_encoding(accept_encoding)
+    default = accepted.get("*", 0.0)
+    qualities = {coding: accepted.get(coding, default) for coding in available}
+    return tuple(sorted((coding for coding in available if qualities[coding] > 0), key=lambda c: -qualities[c]))
@@ -15,6 +15,7 @@ from starlette.middleware import Middleware, _MiddlewareFactory
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.errors import ServerErrorMiddleware
 from starlette.middleware.exceptions import ExceptionMiddleware
+from starlette.middleware.profiling import MiddlewareProfiler
 from starlette.requests import Request
 from starlette.responses import Response
 from starlette.routing import BaseRoute, Router
@@ -76,6 +77,8 @@ class Starlette:
         self.exception_handlers = {} if exception_handlers is None else dict(exception_handlers)
         self.user_middleware = [] if middleware is None else list(middleware)
         self.middleware_stack: ASGIApp | None = None
+        # Set before the application starts, to time each middleware layer.
+        self.middleware_profiler: MiddlewareProfiler | None = None
 
     def build_middleware_stack(self) -> ASGIApp:
         debug = self.debug
@@ -94,9 +97,14 @@ class Starlette:
             + [Middleware(ExceptionMiddleware, handlers=exception_handlers, debug=debug)]
         )
 
-        app = self.router
+        profiler = self.middleware_profiler
+        app: ASGIApp = self.router
+        if profiler is not None:
+            app = profiler.wrap("Router", app)
         for cls, args, kwargs in reversed(middleware):
             app = cls(app, *args, **kwargs)
+            if profiler is not None:
+                app = profiler.wrap(getattr(cls, "__name__", repr(cls)), app)
         return app
 
     @property
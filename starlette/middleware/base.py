@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator, AsyncIterable, Awaitable, Mapping, MutableMapping
-from typing import Any, Callable, TypeVar, Union
+import os
+from collections.abc import AsyncGenerator, AsyncIterable, Awaitable, Iterator, Mapping, MutableMapping
+from typing import Any, Callable, NoReturn, TypeVar, Union
 
 import anyio
 
 from starlette._utils import collapse_excgroups
+from starlette.datastructures import MutableHeaders
 from starlette.requests import ClientDisconnect, Request
 from starlette.responses import Response
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
@@ -130,10 +132,15 @@ class BaseHTTPMiddleware:
                 return message
 
             async def send_no_error(message: Message) -> None:
+                if message["type"] == "http.response.zerocopy":
+                    # The app may close its file as soon as this returns, so the response gets its own.
+                    message = {**message, "file": os.fdopen(os.dup(message["file"].fileno()), "rb")}
                 try:
                     await send_stream.send(message)
                 except anyio.BrokenResourceError:
                     # recv_stream has been closed, i.e. response_sent has been set.
+                    if message["type"] == "http.response.zerocopy":
+                        message["file"].close()
                     return
 
             async def coro() -> None:
@@ -163,9 +170,11 @@ class BaseHTTPMiddleware:
 
             async def body_stream() -> BodyStreamGenerator:
                 async for message in recv_stream:
-                    if message["type"] == "http.response.pathsend":
+                    if message["type"] in ("http.response.pathsend", "http.response.zerocopy"):
                         yield message
-                        break
+                        if not message.get("more_body", False):
+                            break
+                        continue
                     assert message["type"] == "http.response.body", f"Unexpected message: {message}"
                     body = message.get("body", b"")
                     if body:
@@ -192,6 +201,156 @@ class BaseHTTPMiddleware:
         raise NotImplementedError()  # pragma: no cover
 
 
+class InlineHTTPMiddleware:
+    """
+    A `BaseHTTPMiddleware` alternative that runs the downstream app inline,
+    without any extra task or stream. `call_next` returns a response that
+    only runs the downstream app once it is sent, streaming its body through.
+    """
+
+    def __init__(self, app: ASGIApp, dispatch: DispatchFunction | None = None) -> None:
+        self.app = app
+        self.dispatch_func = self.dispatch if dispatch is None else dispatch
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = _CachedRequest(scope, receive)
+
+        async def call_next(request: Request) -> Response:
+            return _InlineResponse(self.app)
+
+        response = await self.dispatch_func(request, call_next)
+        await response(scope, request.wrapped_receive, send)
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        raise NotImplementedError()  # pragma: no cover
+
+
+class _InlineResponse(Response):
+    """
+    The response of the downstream app, which only runs once this is sent. The
+    status code and headers set on it in `dispatch` are applied to the
+    `http.response.start` message the app sends, and the rest of its messages
+    are sent as they are. Since the app hasn't run yet in `dispatch`, reading
+    the status code or headers it sends raises an error.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._status_code: int | None = None
+        self.raw_headers = []
+        self.background = None
+
+    @property
+    def status_code(self) -> int:
+        if self._status_code is None:
+            raise RuntimeError(
+                "The status code isn't known until the response is sent. Use BaseHTTPMiddleware to read it in dispatch."
+            )
+        return self._status_code
+
+    @status_code.setter
+    def status_code(self, value: int) -> None:
+        self._status_code = value
+
+    @property
+    def headers(self) -> MutableHeaders:
+        if not hasattr(self, "_headers"):
+            self._headers = _PendingHeaders(raw=self.raw_headers)
+        return self._headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        started = False
+
+        async def send_with_changes(message: Message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+                message = {**message, "headers": self.apply_headers(message["headers"])}
+                if self._status_code is not None:
+                    message["status"] = self._status_code
+            await send(message)
+
+        await self.app(scope, receive, send_with_changes)
+        if not started:
+            raise RuntimeError("No response returned.")
+        if self.background is not None:
+            await self.background()
+
+    def apply_headers(self, raw_headers: list[tuple[bytes, bytes]]) -> list[tuple[bytes, bytes]]:
+        """
+        Replace the downstream headers with the ones set in `dispatch`, except
+        for list-valued headers, such as `Vary` and `Set-Cookie`, which are
+        added to the downstream ones.
+        """
+        if not self.raw_headers:
+            return raw_headers
+        names = {key for key, _ in self.raw_headers if key not in _LIST_HEADERS}
+        return [(key, value) for key, value in raw_headers if key not in names] + self.raw_headers
+
+
+# Headers that may be repeated, and are added to the downstream ones instead of replacing them.
+_LIST_HEADERS = frozenset({b"set-cookie", b"vary"})
+
+
+class _PendingHeaders(MutableHeaders):
+    """
+    The headers set in `dispatch`, which can't be read or removed, since those
+    of the downstream response aren't known yet.
+    """
+
+    def _unknown(self) -> NoReturn:
+        raise RuntimeError(
+            "The response headers aren't known until the response is sent, "
+            "so they can only be set in dispatch. Use BaseHTTPMiddleware to read them."
+        )
+
+    def keys(self) -> list[str]:  # type: ignore[override]
+        self._unknown()
+
+    def values(self) -> list[str]:  # type: ignore[override]
+        self._unknown()
+
+    def items(self) -> list[tuple[str, str]]:  # type: ignore[override]
+        self._unknown()
+
+    def getlist(self, key: str) -> list[str]:
+        self._unknown()
+
+    def mutablecopy(self) -> MutableHeaders:
+        self._unknown()
+
+    def __getitem__(self, key: str) -> str:
+        self._unknown()
+
+    def __contains__(self, key: Any) -> bool:
+        self._unknown()
+
+    def __iter__(self) -> Iterator[Any]:
+        self._unknown()
+
+    def __len__(self) -> int:
+        self._unknown()
+
+    def __eq__(self, other: Any) -> bool:
+        self._unknown()
+
+    def __delitem__(self, key: str) -> None:
+        self._unknown()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(raw={self.raw!r})"
+
+    def setdefault(self, key: str, value: str) -> str:
+        self._unknown()
+
+    def add_vary_header(self, vary: str) -> None:
+        self.append("vary", vary)
+
+
 class _StreamingResponse(Response):
     def __init__(
         self,
@@ -223,9 +382,14 @@ class _StreamingResponse(Response):
         async for chunk in self.body_iterator:
             if isinstance(chunk, dict):
                 # We got an ASGI message which is not response body (eg: pathsend)
-                should_close_body = False
-                await send(chunk)
+                should_close_body = chunk.get("more_body", False)
+                try:
+                    await send(chunk)
+                finally:
+                    if chunk["type"] == "http.response.zerocopy":
+                        chunk["file"].close()
                 continue
+            should_close_body = True
             await send({"type": "http.response.body", "body": chunk, "more_body": True})
 
         if should_close_body:
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import zlib
+from collections.abc import Mapping, Sequence
+from typing import Callable, NamedTuple, Protocol
+
+import anyio
+
+from starlette._utils import negotiate_encodings
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import CompressedResponseCache, IdentityResponder, OffloadLimiter
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import brotli  # type: ignore[import-not-found,unused-ignore]
+except ModuleNotFoundError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard  # type: ignore[import-not-found,unused-ignore]
+except ModuleNotFoundError:  # pragma: no cover
+    zstandard = None
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes, /) -> bytes: ...  # pragma: no cover
+
+    def flush(self) -> bytes: ...  # pragma: no cover
+
+
+class Codec(NamedTuple):
+    compressor: Callable[[int], Compressor]
+    default_level: int
+
+
+class BrotliCompressor:  # pragma: no cover
+    def __init__(self, level: int) -> None:
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes, /) -> bytes:
+        return self.compressor.process(data)  # type: ignore[no-any-return,unused-ignore]
+
+    def flush(self) -> bytes:
+        return self.compressor.finish()  # type: ignore[no-any-return,unused-ignore]
+
+
+def _zstd_compressor(level: int) -> Compressor:  # pragma: no cover
+    return zstandard.ZstdCompressor(level=level).compressobj()  # type: ignore[no-any-return,unused-ignore]
+
+
+# The available content codings, in order of preference.
+codecs: dict[str, Codec] = {}
+if zstandard is not None:  # pragma: no cover
+    codecs["zstd"] = Codec(_zstd_compressor, 3)
+if brotli is not None:  # pragma: no cover
+    codecs["br"] = Codec(BrotliCompressor, 4)
+codecs["gzip"] = Codec(lambda level: zlib.compressobj(level, zlib.DEFLATED, 31), 9)
+codecs["deflate"] = Codec(lambda level: zlib.compressobj(level, zlib.DEFLATED, 15), 9)
+
+
+def register_codec(content_encoding: str, compressor: Callable[[int], Compressor], default_level: int) -> None:
+    """
+    Make a content coding available to `CompressionMiddleware`, or replace the
+    implementation of an existing one. New codings are least preferred.
+    """
+    codecs[content_encoding] = Codec(compressor, default_level)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        encodings: Sequence[str] | None = None,
+        levels: Mapping[str, int] | None = None,
+        offload_size: int | None = 256 * 1024,
+        offload_limit: int = 4,
+        cache: CompressedResponseCache | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = tuple(codecs if encodings is None else encodings)
+        for encoding in self.encodings:
+            assert encoding in codecs, f"Unsupported content encoding {encoding!r}."
+        self.levels = {encoding: codecs[encoding].default_level for encoding in self.encodings}
+        self.levels.update(levels or {})
+        self.offload_size = offload_size
+        self.offload_limiter = OffloadLimiter(offload_limit)
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":  # pragma: no cover
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encodings = negotiate_encodings(headers.get("Accept-Encoding", ""), self.encodings)
+        responder: ASGIApp
+        if encodings:
+            encoding = encodings[0]
+            responder = CompressionResponder(
+                self.app,
+                self.minimum_size,
+                encoding,
+                codecs[encoding].compressor,
+                self.levels[encoding],
+                offload_size=self.offload_size,
+                limiter=self.offload_limiter.get(),
+                cache=self.cache,
+            )
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+
+        await responder(scope, receive, send)
+
+
+class CompressionResponder(IdentityResponder):
+    compresslevel: int
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        content_encoding: str,
+        compressor: Callable[[int], Compressor],
+        compresslevel: int,
+        offload_size: int | None = None,
+        limiter: anyio.CapacityLimiter | None = None,
+        cache: CompressedResponseCache | None = None,
+    ) -> None:
+        super().__init__(app, minimum_size, offload_size, limiter, cache)
+        self.content_encoding = content_encoding
+        self.compresslevel = compresslevel
+        self.create_compressor = compressor
+        self.compressor: Compressor | None = None
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self.compressor is None:
+            # Only created once the body is known to be large enough to compress.
+            self.compressor = self.create_compressor(self.compresslevel)
+        body = self.compressor.compress(body)
+        if not more_body:
+            body += self.compressor.flush()
+        return body
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import zlib
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# The `wbits` value selecting the format of each supported content coding.
+DECOMPRESSION_WBITS = {"gzip": 31, "x-gzip": 31, "deflate": 15}
+
+
+class RequestDecompressionMiddleware:
+    def __init__(self, app: ASGIApp, max_size: int | None = 10 * 1024 * 1024, chunk_size: int = 64 * 1024) -> None:
+        self.app = app
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":  # pragma: no cover
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_encoding = headers.get("content-encoding", "").strip().lower()
+        if content_encoding not in DECOMPRESSION_WBITS:
+            await self.app(scope, receive, send)
+            return
+
+        # Downstream sees a plain body, whose length isn't known in advance.
+        scope = dict(scope)
+        scope["headers"] = [
+            (key, value) for key, value in scope["headers"] if key not in (b"content-encoding", b"content-length")
+        ]
+        receiver = DecompressingReceiver(receive, DECOMPRESSION_WBITS[content_encoding], self.max_size, self.chunk_size)
+        await self.app(scope, receiver, send)
+
+
+class DecompressingReceiver:
+    """
+    Inflates `http.request` messages incrementally. Each message carries at
+    most `chunk_size` bytes of decompressed body, so a small compressed chunk
+    may be spread over several messages.
+    """
+
+    def __init__(self, receive: Receive, wbits: int, max_size: int | None, chunk_size: int) -> None:
+        self.receive = receive
+        self.decompressor = zlib.decompressobj(wbits)
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.size = 0
+        self.more_body = True
+
+    async def __call__(self) -> Message:
+        data = self.decompressor.unconsumed_tail
+        if not data:
+            message = await self.receive()
+            if message["type"] != "http.request":
+                return message
+            data = message.get("body", b"")
+            self.more_body = message.get("more_body", False)
+
+        try:
+            body = self.decompressor.decompress(data, self.chunk_size)
+        except zlib.error:
+            raise HTTPException(status_code=400, detail="Invalid compressed request body.")
+
+        self.size += len(body)
+        if self.max_size is not None and self.size > self.max_size:
+            raise HTTPException(status_code=413)
+
+        more_body = self.more_body or bool(self.decompressor.unconsumed_tail)
+        if not more_body and (not self.decompressor.eof or self.decompressor.unused_data):
+            raise HTTPException(status_code=400, detail="Invalid compressed request body.")
+        return {"type": "http.request", "body": body, "more_body": more_body}
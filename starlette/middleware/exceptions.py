@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import http
 from collections.abc import Mapping
 from typing import Any
 
 from starlette._exception_handler import (
-    ExceptionHandlers,
+    ExceptionHandlerTable,
+    ResponseStartTracker,
     StatusHandlers,
-    wrap_app_handling_exceptions,
+    handle_exception,
 )
 from starlette.exceptions import HTTPException, WebSocketException
 from starlette.requests import Request
@@ -25,10 +27,14 @@ class ExceptionMiddleware:
         self.app = app
         self.debug = debug  # TODO: We ought to handle 404 cases if debug is set.
         self._status_handlers: StatusHandlers = {}
-        self._exception_handlers: ExceptionHandlers = {
-            HTTPException: self.http_exception,
-            WebSocketException: self.websocket_exception,
-        }
+        self._exception_handlers = ExceptionHandlerTable(
+            {
+                HTTPException: self.http_exception,
+                WebSocketException: self.websocket_exception,
+            }
+        )
+        # Default responses to `HTTPException`s, keyed by status code and `Allow` header.
+        self._default_responses: dict[tuple[int, str | None], tuple[str, Response]] = {}
         if handlers is not None:  # pragma: no branch
             for key, value in handlers.items():
                 self.add_exception_handler(key, value)
@@ -49,25 +55,56 @@ class ExceptionMiddleware:
             await self.app(scope, receive, send)
             return
 
-        scope["starlette.exception_handlers"] = (
-            self._exception_handlers,
-            self._status_handlers,
-        )
-
-        conn: Request | WebSocket
-        if scope["type"] == "http":
-            conn = Request(scope, receive, send)
-        else:
-            conn = WebSocket(scope, receive, send)
+        handlers = (self._exception_handlers, self._status_handlers)
+        scope["starlette.exception_handlers"] = handlers
 
-        await wrap_app_handling_exceptions(self.app, conn)(scope, receive, send)
+        sender = ResponseStartTracker(send)
+        try:
+            await self.app(scope, receive, sender)
+        except Exception as exc:
+            conn: Request | WebSocket
+            if scope["type"] == "http":
+                conn = Request(scope, receive, send)
+            else:
+                conn = WebSocket(scope, receive, send)
+            await handle_exception(exc, conn, handlers, scope, receive, sender)
 
     async def http_exception(self, request: Request, exc: Exception) -> Response:
         assert isinstance(exc, HTTPException)
+        key = self._default_response_key(exc)
+        if key is None:
+            return self.render_http_exception(exc)
+
+        cached = self._default_responses.get(key)
+        if cached is not None and cached[0] == exc.detail:
+            return cached[1]
+        try:
+            is_default_detail = exc.detail == http.HTTPStatus(exc.status_code).phrase
+        except ValueError:
+            is_default_detail = False
+        if not is_default_detail:
+            return self.render_http_exception(exc)
+
+        response = self.render_http_exception(exc).freeze()
+        self._default_responses[key] = (exc.detail, response)
+        return response
+
+    def render_http_exception(self, exc: HTTPException) -> Response:
         if exc.status_code in {204, 304}:
             return Response(status_code=exc.status_code, headers=exc.headers)
         return PlainTextResponse(exc.detail, status_code=exc.status_code, headers=exc.headers)
 
+    def _default_response_key(self, exc: HTTPException) -> tuple[int, str | None] | None:
+        # Only the `Allow` header of 405 responses varies enough between routes
+        # to be worth caching. Responses with other headers are rendered each time.
+        if not exc.headers:
+            return exc.status_code, None
+        if len(exc.headers) == 1:
+            ((name, value),) = exc.headers.items()
+            if name.lower() == "allow":
+                return exc.status_code, value
+        return None
+
     async def websocket_exception(self, websocket: WebSocket, exc: Exception) -> None:
         assert isinstance(exc, WebSocketException)
         await websocket.close(code=exc.code, reason=exc.reason)  # pragma: no cover
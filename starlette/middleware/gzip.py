@@ -1,18 +1,145 @@
-import gzip
-import io
+from __future__ import annotations
+
+import functools
+import hashlib
+import itertools
+import os
+import time
+import zlib
+from collections import OrderedDict
 from typing import NoReturn
 
+import anyio
+import anyio.to_thread
+from anyio.lowlevel import RunVar
+
 from starlette.datastructures import Headers, MutableHeaders
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 DEFAULT_EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+# How much of a zero-copy range is read at once, when it has to be compressed.
+ZEROCOPY_READ_SIZE = 64 * 1024
+# RunVars are stored by name, so each limiter needs a name of its own.
+_offload_limiter_ids = itertools.count()
+
+
+class OffloadLimiter:
+    """
+    Bounds how many worker threads a single middleware instance may use to
+    compress large bodies. A limiter is created lazily for each event loop.
+    """
+
+    def __init__(self, total_tokens: int) -> None:
+        self.total_tokens = total_tokens
+        self.limiters: RunVar[anyio.CapacityLimiter] = RunVar(f"offload_limiter_{next(_offload_limiter_ids)}")
+
+    def get(self) -> anyio.CapacityLimiter:
+        limiter = self.limiters.get(None)
+        if limiter is None:
+            limiter = anyio.CapacityLimiter(self.total_tokens)
+            self.limiters.set(limiter)
+        return limiter
+
+
+class CompressedResponseCache:
+    """
+    A bounded LRU of compressed bodies, keyed by the content coding, the
+    compression level and a digest of the uncompressed body. Only complete
+    (non-streaming) bodies of at most `max_body_size` bytes are cached.
+    """
+
+    def __init__(self, maxsize: int = 256, max_body_size: int = 64 * 1024) -> None:
+        self.maxsize = maxsize
+        self.max_body_size = max_body_size
+        self.entries: OrderedDict[tuple[str, int | None, bytes], bytes] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: tuple[str, int | None, bytes]) -> bytes | None:
+        body = self.entries.get(key)
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return body
+
+    def set(self, key: tuple[str, int | None, bytes], body: bytes) -> None:
+        self.entries[key] = body
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+
+class AdaptiveCompressionLevel:
+    """
+    Picks the compression level from the share of time the event loop
+    recently spent compressing. Chunks compressed in worker threads are not
+    counted, since they don't block the event loop. Every `interval` seconds,
+    the level steps down if more than `high_load` of the elapsed time went to
+    compression, and back up if less than `low_load` did. Stepping down from
+    `min_level` skips compression, which is reported as a level of 0.
+    """
+
+    def __init__(
+        self,
+        max_level: int = 9,
+        min_level: int = 1,
+        interval: float = 1.0,
+        high_load: float = 0.25,
+        low_load: float = 0.05,
+    ) -> None:
+        assert 1 <= min_level <= max_level <= 9, (
+            "Compression levels must be such that 1 <= min_level <= max_level <= 9."
+        )
+        self.max_level = max_level
+        self.min_level = min_level
+        self.interval = interval
+        self.high_load = high_load
+        self.low_load = low_load
+        self.current_level = max_level
+        self.load = 0.0
+        self.busy = 0.0
+        self.window_start = time.monotonic()
+
+    def level(self) -> int:
+        now = time.monotonic()
+        elapsed = now - self.window_start
+        if elapsed >= self.interval:
+            self.load = self.busy / elapsed
+            if self.load > self.high_load and self.current_level > 0:
+                self.current_level = self.current_level - 1 if self.current_level > self.min_level else 0
+            elif self.load < self.low_load and self.current_level < self.max_level:
+                self.current_level = max(self.current_level + 1, self.min_level)
+            self.busy = 0.0
+            self.window_start = now
+        return self.current_level
+
+    def record(self, seconds: float) -> None:
+        self.busy += seconds
 
 
 class GZipMiddleware:
-    def __init__(self, app: ASGIApp, minimum_size: int = 500, compresslevel: int = 9) -> None:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        compresslevel: int | AdaptiveCompressionLevel = 9,
+        offload_size: int | None = 256 * 1024,
+        offload_limit: int = 4,
+        cache: CompressedResponseCache | None = None,
+    ) -> None:
         self.app = app
         self.minimum_size = minimum_size
         self.compresslevel = compresslevel
+        self.offload_size = offload_size
+        self.offload_limiter = OffloadLimiter(offload_limit)
+        self.cache = cache
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] != "http":  # pragma: no cover
@@ -20,9 +147,22 @@ class GZipMiddleware:
             return
 
         headers = Headers(scope=scope)
+        compresslevel = self.compresslevel
+        adaptive = None
+        if isinstance(compresslevel, AdaptiveCompressionLevel):
+            adaptive = compresslevel
+            compresslevel = adaptive.level()
         responder: ASGIApp
-        if "gzip" in headers.get("Accept-Encoding", ""):
-            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        if "gzip" in headers.get("Accept-Encoding", "") and compresslevel:
+            responder = GZipResponder(
+                self.app,
+                self.minimum_size,
+                compresslevel=compresslevel,
+                offload_size=self.offload_size,
+                limiter=self.offload_limiter.get(),
+                cache=self.cache,
+                adaptive=adaptive,
+            )
         else:
             responder = IdentityResponder(self.app, self.minimum_size)
 
@@ -30,16 +170,28 @@ class GZipMiddleware:
 
 
 class IdentityResponder:
-    content_encoding: str
+    # Set by responders that compress the body.
+    content_encoding: str | None = None
+    compresslevel: int | None = None
+    adaptive: AdaptiveCompressionLevel | None = None
 
-    def __init__(self, app: ASGIApp, minimum_size: int) -> None:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        offload_size: int | None = None,
+        limiter: anyio.CapacityLimiter | None = None,
+        cache: CompressedResponseCache | None = None,
+    ) -> None:
         self.app = app
         self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.limiter = limiter
+        self.cache = cache
         self.send: Send = unattached_send
         self.initial_message: Message = {}
         self.started = False
-        self.content_encoding_set = False
-        self.content_type_is_excluded = False
+        self.passthrough = False
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         self.send = send
@@ -52,9 +204,10 @@ class IdentityResponder:
             # modify the outgoing headers correctly.
             self.initial_message = message
             headers = Headers(raw=self.initial_message["headers"])
-            self.content_encoding_set = "content-encoding" in headers
-            self.content_type_is_excluded = headers.get("content-type", "").startswith(DEFAULT_EXCLUDED_CONTENT_TYPES)
-        elif message_type == "http.response.body" and (self.content_encoding_set or self.content_type_is_excluded):
+            self.passthrough = "content-encoding" in headers or headers.get("content-type", "").startswith(
+                DEFAULT_EXCLUDED_CONTENT_TYPES
+            )
+        elif message_type == "http.response.body" and self.passthrough:
             if not self.started:
                 self.started = True
                 await self.send(self.initial_message)
@@ -69,11 +222,11 @@ class IdentityResponder:
                 await self.send(message)
             elif not more_body:
                 # Standard response.
-                body = self.apply_compression(body, more_body=False)
+                body = await self.compress_body(body)
 
                 headers = MutableHeaders(raw=self.initial_message["headers"])
                 headers.add_vary_header("Accept-Encoding")
-                if body != message["body"]:
+                if self.content_encoding is not None:
                     headers["Content-Encoding"] = self.content_encoding
                     headers["Content-Length"] = str(len(body))
                     message["body"] = body
@@ -82,11 +235,11 @@ class IdentityResponder:
                 await self.send(message)
             else:
                 # Initial body in streaming response.
-                body = self.apply_compression(body, more_body=True)
+                body = await self.compress(body, more_body=True)
 
                 headers = MutableHeaders(raw=self.initial_message["headers"])
                 headers.add_vary_header("Accept-Encoding")
-                if body != message["body"]:
+                if self.content_encoding is not None:
                     headers["Content-Encoding"] = self.content_encoding
                     del headers["Content-Length"]
                     message["body"] = body
@@ -98,14 +251,67 @@ class IdentityResponder:
             body = message.get("body", b"")
             more_body = message.get("more_body", False)
 
-            message["body"] = self.apply_compression(body, more_body=more_body)
+            message["body"] = await self.compress(body, more_body=more_body)
 
             await self.send(message)
+        elif message_type == "http.response.zerocopy" and (self.passthrough or not self.started):
+            # Don't apply GZip to responses that start with a zero-copy body.
+            if not self.started:
+                self.started = True
+                self.passthrough = True
+                await self.send(self.initial_message)
+            await self.send(message)
+        elif message_type == "http.response.zerocopy":
+            # The body is already being compressed, so read the range from the file.
+            await self.send_zerocopy_compressed(message)
         elif message_type == "http.response.pathsend":  # pragma: no branch
             # Don't apply GZip to pathsend responses
             await self.send(self.initial_message)
             await self.send(message)
 
+    async def send_zerocopy_compressed(self, message: Message) -> None:
+        fd = message["file"].fileno()
+        offset = message.get("offset", 0)
+        count = message.get("count")
+        end = os.fstat(fd).st_size if count is None else offset + count
+        more_body = message.get("more_body", False)
+        while True:
+            chunk = await anyio.to_thread.run_sync(os.pread, fd, min(ZEROCOPY_READ_SIZE, end - offset), offset)
+            offset += len(chunk)
+            finished = offset >= end or not chunk
+            body = await self.compress(chunk, more_body=more_body or not finished)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body or not finished})
+            if finished:
+                break
+
+    async def compress(self, body: bytes, *, more_body: bool) -> bytes:
+        """Apply compression, in a worker thread if the chunk is large.
+
+        Compressing a large chunk can block the event loop for tens of
+        milliseconds, while zlib and friends release the GIL. Only the time
+        spent compressing on the event loop is recorded as load.
+        """
+        if self.offload_size is not None and len(body) >= self.offload_size:
+            func = functools.partial(self.apply_compression, body, more_body=more_body)
+            return await anyio.to_thread.run_sync(func, limiter=self.limiter)
+        if self.adaptive is None:
+            return self.apply_compression(body, more_body=more_body)
+        start = time.perf_counter()
+        body = self.apply_compression(body, more_body=more_body)
+        self.adaptive.record(time.perf_counter() - start)
+        return body
+
+    async def compress_body(self, body: bytes) -> bytes:
+        """Compress a complete response body, going through the cache if any."""
+        if self.cache is None or self.content_encoding is None or len(body) > self.cache.max_body_size:
+            return await self.compress(body, more_body=False)
+        key = (self.content_encoding, self.compresslevel, hashlib.sha256(body).digest())
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = await self.compress(body, more_body=False)
+            self.cache.set(key, compressed)
+        return compressed
+
     def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
         """Apply compression on the response body.
 
@@ -118,26 +324,31 @@ class IdentityResponder:
 
 class GZipResponder(IdentityResponder):
     content_encoding = "gzip"
+    compresslevel: int
 
-    def __init__(self, app: ASGIApp, minimum_size: int, compresslevel: int = 9) -> None:
-        super().__init__(app, minimum_size)
-
-        self.gzip_buffer = io.BytesIO()
-        self.gzip_file = gzip.GzipFile(mode="wb", fileobj=self.gzip_buffer, compresslevel=compresslevel)
-
-    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
-        with self.gzip_buffer, self.gzip_file:
-            await super().__call__(scope, receive, send)
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        compresslevel: int = 9,
+        offload_size: int | None = None,
+        limiter: anyio.CapacityLimiter | None = None,
+        cache: CompressedResponseCache | None = None,
+        adaptive: AdaptiveCompressionLevel | None = None,
+    ) -> None:
+        super().__init__(app, minimum_size, offload_size, limiter, cache)
+        self.compresslevel = compresslevel
+        self.adaptive = adaptive
+        self.compressor: zlib._Compress | None = None
 
     def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
-        self.gzip_file.write(body)
+        if self.compressor is None:
+            # Only created once the body is known to be large enough to compress.
+            # A `wbits` value of 31 selects the gzip format.
+            self.compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, 31)
+        body = self.compressor.compress(body)
         if not more_body:
-            self.gzip_file.close()
-
-        body = self.gzip_buffer.getvalue()
-        self.gzip_buffer.seek(0)
-        self.gzip_buffer.truncate()
-
+            body += self.compressor.flush()
         return body
 
 
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import bisect
+import math
+import time
+from collections.abc import Sequence
+from contextvars import ContextVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PHASES = ("before", "body", "after")
+
+# Bucket upper bounds, in seconds.
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """
+    Counts durations into fixed buckets, so that recording one costs a
+    bisection and a few additions.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Return the upper bound of the bucket holding the `q` quantile, which
+        is infinite if it is past the last bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+
+class LayerStats:
+    """
+    The timings of one middleware layer. Inclusive time covers everything
+    that runs while the layer is active, including the layers inside it.
+    Exclusive time only counts the layer's own code, which includes the code
+    of its `send` and `receive` callables that inner layers call.
+    """
+
+    def __init__(self, name: str, buckets: Sequence[float]) -> None:
+        self.name = name
+        self.inclusive = {phase: Histogram(buckets) for phase in (*PHASES, "total")}
+        self.exclusive = {phase: Histogram(buckets) for phase in (*PHASES, "total")}
+
+
+class _LayerCall:
+    __slots__ = ("phase", "exclusive", "entered", "started", "finished")
+
+    def __init__(self) -> None:
+        self.phase = 0
+        self.exclusive = [0.0, 0.0, 0.0]
+        self.entered = 0.0
+        self.started: float | None = None
+        self.finished: float | None = None
+
+
+class _RequestTimer:
+    """
+    Tracks which layer is running during a request. Each switch charges the
+    elapsed time to the layer that was running, in its current phase.
+    """
+
+    def __init__(self) -> None:
+        self.current: _LayerCall | None = None
+        self.last = time.perf_counter()
+
+    def switch(self, to: _LayerCall | None) -> _LayerCall | None:
+        now = time.perf_counter()
+        current = self.current
+        if current is not None:
+            current.exclusive[current.phase] += now - self.last
+        self.last = now
+        self.current = to
+        return current
+
+
+class MiddlewareProfiler:
+    """
+    Records where time goes in a middleware stack, per layer and per phase:
+    before `http.response.start` is sent, while the body is sent, and after
+    the response is complete.
+
+    Exclusive times assume the layers run in a single task. Layers that run
+    the inner application in another task, such as `BaseHTTPMiddleware`,
+    get approximate exclusive times.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.layers: dict[str, LayerStats] = {}
+        self.timer: ContextVar[_RequestTimer | None] = ContextVar("middleware_profiler_timer", default=None)
+
+    def wrap(self, name: str, app: ASGIApp) -> ASGIApp:
+        if name in self.layers:
+            name = f"{name}#{sum(layer.startswith(f'{name}#') for layer in self.layers) + 2}"
+        stats = self.layers[name] = LayerStats(name, self.buckets)
+        return _ProfiledLayer(app, stats, self.timer)
+
+    def reset(self) -> None:
+        for name, stats in self.layers.items():
+            self.layers[name] = LayerStats(name, self.buckets)
+
+    def report(self) -> str:
+        """
+        Return a table of the layers, the most expensive ones first, with
+        mean times in milliseconds.
+        """
+        rows: list[tuple[str, ...]] = [
+            ("Layer", "Requests", "Inclusive", "Exclusive", "Excl. p99", "Before", "Body", "After")
+        ]
+        for stats in sorted(self.layers.values(), key=lambda stats: stats.exclusive["total"].total, reverse=True):
+            exclusive = stats.exclusive
+            rows.append(
+                (
+                    stats.name,
+                    str(exclusive["total"].count),
+                    f"{stats.inclusive['total'].mean * 1000:.3f}",
+                    f"{exclusive['total'].mean * 1000:.3f}",
+                    f"{exclusive['total'].quantile(0.99) * 1000:.3f}",
+                    *(f"{exclusive[phase].mean * 1000:.3f}" for phase in PHASES),
+                )
+            )
+        widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+        return "\n".join(
+            "  ".join(
+                cell.ljust(width) if column == 0 else cell.rjust(width)
+                for column, (cell, width) in enumerate(zip(row, widths))
+            ).rstrip()
+            for row in rows
+        )
+
+
+class _ProfiledLayer:
+    def __init__(self, app: ASGIApp, stats: LayerStats, timer: ContextVar[_RequestTimer | None]) -> None:
+        self.app = app
+        self.stats = stats
+        self.timer = timer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = self.timer.get()
+        token = None
+        if timer is None:
+            timer = _RequestTimer()
+            token = self.timer.set(timer)
+
+        call = _LayerCall()
+        parent = timer.switch(call)
+        call.entered = timer.last
+
+        async def profiled_receive() -> Message:
+            previous = timer.switch(parent)
+            try:
+                return await receive()
+            finally:
+                timer.switch(previous)
+
+        async def profiled_send(message: Message) -> None:
+            previous = timer.switch(parent)
+            if message["type"] == "http.response.start":
+                call.phase = 1
+                call.started = timer.last
+            try:
+                await send(message)
+            finally:
+                timer.switch(previous)
+            if message["type"] == "http.response.pathsend" or (
+                message["type"] in ("http.response.body", "http.response.zerocopy")
+                and not message.get("more_body", False)
+            ):
+                call.phase = 2
+                call.finished = timer.last
+
+        try:
+            await self.app(scope, profiled_receive, profiled_send)
+        finally:
+            timer.switch(parent)
+            if token is not None:
+                self.timer.reset(token)
+            self.record(call, timer.last)
+
+    def record(self, call: _LayerCall, exited: float) -> None:
+        started = exited if call.started is None else call.started
+        finished = exited if call.finished is None else call.finished
+        inclusive = self.stats.inclusive
+        inclusive["before"].observe(started - call.entered)
+        inclusive["body"].observe(finished - started)
+        inclusive["after"].observe(exited - finished)
+        inclusive["total"].observe(exited - call.entered)
+        exclusive = self.stats.exclusive
+        for phase, duration in zip(PHASES, call.exclusive):
+            exclusive[phase].observe(duration)
+        exclusive["total"].observe(sum(call.exclusive))
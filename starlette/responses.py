@@ -3,15 +3,20 @@ from __future__ import annotations
 import hashlib
 import http.cookies
 import json
+import math
+import mmap
 import os
 import re
 import stat
 import sys
+import time
 import warnings
-from collections.abc import AsyncIterable, Awaitable, Iterable, Mapping, Sequence
+from collections import OrderedDict
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Iterable, Mapping, Sequence
+from contextlib import asynccontextmanager
 from datetime import datetime
-from email.utils import format_datetime, formatdate
-from functools import partial
+from email.utils import format_datetime, formatdate, parsedate
+from functools import lru_cache, partial
 from mimetypes import guess_type
 from secrets import token_hex
 from typing import Any, Callable, Literal, Union
@@ -19,6 +24,9 @@ from urllib.parse import quote
 
 import anyio
 import anyio.to_thread
+from anyio.abc import TaskGroup
+from anyio.lowlevel import RunVar
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 
 from starlette._utils import collapse_excgroups
 from starlette.background import BackgroundTask
@@ -27,6 +35,30 @@ from starlette.datastructures import URL, Headers, MutableHeaders
 from starlette.requests import ClientDisconnect
 from starlette.types import Receive, Scope, Send
 
+RawHeaders = tuple[tuple[bytes, bytes], ...]
+
+
+@lru_cache(maxsize=256)
+def _header_template(media_type: str | None, charset: str, header_names: tuple[str, ...]) -> tuple[RawHeaders, bool]:
+    """
+    Pre-encode the parts of the response headers that don't depend on the body.
+
+    Returns the `content-type` header to append after `content-length` (if one
+    should be added), and whether `content-length` should be populated. Only
+    header names are part of the key, so that header values are neither
+    retained nor able to churn the cache.
+    """
+    keys = {name.lower() for name in header_names}
+
+    content_type_headers: RawHeaders = ()
+    if media_type is not None and "content-type" not in keys:
+        content_type = media_type
+        if content_type.startswith("text/") and "charset=" not in content_type.lower():
+            content_type += "; charset=" + charset
+        content_type_headers = ((b"content-type", content_type.encode("latin-1")),)
+
+    return content_type_headers, "content-length" not in keys
+
 
 class Response:
     media_type = None
@@ -57,13 +89,11 @@ class Response:
     def init_headers(self, headers: Mapping[str, str] | None = None) -> None:
         if headers is None:
             raw_headers: list[tuple[bytes, bytes]] = []
-            populate_content_length = True
-            populate_content_type = True
+            header_names: tuple[str, ...] = ()
         else:
             raw_headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()]
-            keys = [h[0] for h in raw_headers]
-            populate_content_length = b"content-length" not in keys
-            populate_content_type = b"content-type" not in keys
+            header_names = tuple(headers)
+        content_type_headers, populate_content_length = _header_template(self.media_type, self.charset, header_names)
 
         body = getattr(self, "body", None)
         if (
@@ -74,12 +104,7 @@ class Response:
             content_length = str(len(body))
             raw_headers.append((b"content-length", content_length.encode("latin-1")))
 
-        content_type = self.media_type
-        if content_type is not None and populate_content_type:
-            if content_type.startswith("text/") and "charset=" not in content_type.lower():
-                content_type += "; charset=" + self.charset
-            raw_headers.append((b"content-type", content_type.encode("latin-1")))
-
+        raw_headers.extend(content_type_headers)
         self.raw_headers = raw_headers
 
     @property
@@ -153,6 +178,16 @@ class Response:
             samesite=samesite,
         )
 
+    def freeze(self) -> PrecomputedResponse:
+        """
+        Return a `PrecomputedResponse` with this response's rendered body and
+        headers, which can be reused to answer any number of requests.
+        """
+        assert self.background is None, "Responses with background tasks cannot be frozen."
+        response = PrecomputedResponse(self.body, status_code=self.status_code)
+        response.raw_headers = list(self.raw_headers)
+        return response
+
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         prefix = "websocket." if scope["type"] == "websocket" else ""
         await send(
@@ -168,6 +203,37 @@ class Response:
             await self.background()
 
 
+class PrecomputedResponse(Response):
+    """
+    A response that is rendered once, and can then be sent any number of
+    times, including concurrently.
+
+    Body and headers are never re-rendered. Each send gets fresh message dicts
+    and a copy of the header list, since middleware may modify the messages
+    they are given in place.
+    """
+
+    def __init__(
+        self,
+        content: Any = None,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = None,
+    ) -> None:
+        super().__init__(content, status_code, headers, media_type)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await super().__call__(scope, receive, send)
+            return
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers[:]})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+        else:
+            await send({"type": "http.response.body", "body": self.body})
+
+
 class HTMLResponse(Response):
     media_type = "text/html"
 
@@ -211,12 +277,27 @@ class RedirectResponse(Response):
         self.headers["location"] = quote(str(url), safe=":/%#?=@[]!$&'()*+,;")
 
 
+class Flush:
+    """
+    Marker type for `FLUSH`, which can be yielded by a `StreamingResponse` body
+    iterator to send any buffered content immediately.
+    """
+
+
+FLUSH = Flush()
+
 Content = Union[str, bytes, memoryview]
-SyncContentStream = Iterable[Content]
-AsyncContentStream = AsyncIterable[Content]
+SyncContentStream = Iterable[Union[Content, Flush]]
+AsyncContentStream = AsyncIterable[Union[Content, Flush]]
 ContentStream = Union[AsyncContentStream, SyncContentStream]
 
 
+def _join(chunks: list[bytes | memoryview]) -> bytes | memoryview:
+    if len(chunks) == 1:
+        return chunks[0]
+    return b"".join(chunks)
+
+
 class StreamingResponse(Response):
     body_iterator: AsyncContentStream
 
@@ -227,7 +308,11 @@ class StreamingResponse(Response):
         headers: Mapping[str, str] | None = None,
         media_type: str | None = None,
         background: BackgroundTask | None = None,
+        buffer_size: int | None = None,
+        flush_interval: float | None = None,
+        disconnect_listener: bool = True,
     ) -> None:
+        assert flush_interval is None or buffer_size is not None, "'flush_interval' requires 'buffer_size' to be set."
         if isinstance(content, AsyncIterable):
             self.body_iterator = content
         else:
@@ -235,6 +320,14 @@ class StreamingResponse(Response):
         self.status_code = status_code
         self.media_type = self.media_type if media_type is None else media_type
         self.background = background
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        # On servers implementing ASGI < 2.4, `send()` isn't guaranteed to raise once the
+        # client has gone away, so `receive()` is watched for `http.disconnect` in a
+        # separate task. Opting out of it saves that task and its task group, at the
+        # cost of not detecting disconnects there: the response then streams until its
+        # content is exhausted, unless `send()` happens to raise.
+        self.disconnect_listener = disconnect_listener
         self.init_headers(headers)
 
     async def listen_for_disconnect(self, receive: Receive) -> None:
@@ -251,17 +344,103 @@ class StreamingResponse(Response):
                 "headers": self.raw_headers,
             }
         )
+        if self.buffer_size is not None:
+            await self.stream_buffered_response(send, self.buffer_size)
+            return
+
         async for chunk in self.body_iterator:
+            if isinstance(chunk, Flush):
+                continue
             if not isinstance(chunk, (bytes, memoryview)):
                 chunk = chunk.encode(self.charset)
             await send({"type": "http.response.body", "body": chunk, "more_body": True})
 
         await send({"type": "http.response.body", "body": b"", "more_body": False})
 
+    async def stream_buffered_response(self, send: Send, buffer_size: int) -> None:
+        """
+        Coalesce small chunks into messages of at least `buffer_size` bytes.
+
+        The first chunk is always sent straight away, so that the time to first
+        byte is unaffected. Buffered content is also sent when the iterator
+        yields `FLUSH`, or once it has been buffered for `flush_interval`
+        seconds, even if no further chunk arrives.
+        """
+        buffer: list[bytes | memoryview] = []
+        buffered_size = 0
+        flush_deadline = math.inf
+        first_chunk = True
+
+        async def flush() -> None:
+            nonlocal buffer, buffered_size, flush_deadline
+            await send({"type": "http.response.body", "body": _join(buffer), "more_body": True})
+            buffer, buffered_size, flush_deadline = [], 0, math.inf
+
+        async def add(chunk: Content | Flush) -> None:
+            nonlocal buffered_size, flush_deadline, first_chunk
+            if isinstance(chunk, Flush):
+                if buffer:
+                    await flush()
+                return
+            if not isinstance(chunk, (bytes, memoryview)):
+                chunk = chunk.encode(self.charset)
+            if first_chunk:
+                first_chunk = False
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                return
+
+            if not buffer and self.flush_interval is not None:
+                flush_deadline = anyio.current_time() + self.flush_interval
+            buffer.append(chunk)
+            buffered_size += len(chunk)
+            if buffered_size >= buffer_size:
+                await flush()
+
+        if self.flush_interval is None:
+            async for chunk in self.body_iterator:
+                await add(chunk)
+        else:
+            # The iterator runs in its own task, so that waiting for the next chunk
+            # can be given up when the buffered content is due. Chunks are handed over
+            # through a small buffer without checkpoints, to keep the switches between
+            # the two tasks rare.
+            streams: tuple[MemoryObjectSendStream[Content | Flush], MemoryObjectReceiveStream[Content | Flush]]
+            streams = anyio.create_memory_object_stream(64)
+            send_stream, receive_stream = streams
+
+            async def produce() -> None:
+                async with send_stream:
+                    async for chunk in self.body_iterator:
+                        try:
+                            send_stream.send_nowait(chunk)
+                        except anyio.WouldBlock:
+                            await send_stream.send(chunk)
+
+            with collapse_excgroups():
+                async with anyio.create_task_group() as task_group, receive_stream:
+                    task_group.start_soon(produce)
+                    while True:
+                        next_chunk: Content | Flush | None = None
+                        try:
+                            try:
+                                # Chunks that are already waiting don't need a cancel scope.
+                                next_chunk = receive_stream.receive_nowait()
+                            except anyio.WouldBlock:
+                                with anyio.CancelScope(deadline=flush_deadline):
+                                    next_chunk = await receive_stream.receive()
+                        except anyio.EndOfStream:
+                            break
+                        if next_chunk is None:
+                            await flush()
+                        else:
+                            await add(next_chunk)
+
+        await send({"type": "http.response.body", "body": _join(buffer), "more_body": False})
+
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         spec_version = tuple(map(int, scope.get("asgi", {}).get("spec_version", "2.0").split(".")))
 
-        if spec_version >= (2, 4):
+        if spec_version >= (2, 4) or not self.disconnect_listener:
             try:
                 await self.stream_response(send)
             except OSError:
@@ -281,6 +460,292 @@ class StreamingResponse(Response):
             await self.background()
 
 
+_SSE_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+_SSE_COMMENT = b": "
+_SSE_ID = b"id: "
+_SSE_EVENT = b"event: "
+_SSE_RETRY = b"retry: "
+_SSE_DATA = b"data: "
+_SSE_PING = b": ping\n\n"
+
+
+class ServerSentEvent:
+    def __init__(
+        self,
+        data: str | None = None,
+        *,
+        event: str | None = None,
+        id: str | None = None,
+        retry: int | None = None,
+        comment: str | None = None,
+    ) -> None:
+        for name, value in (("event", event), ("id", id)):
+            if value is not None and _SSE_LINE_BREAK.search(value):
+                raise ValueError(f"Server-sent event {name!r} must not contain line breaks.")
+        self.data = data
+        self.event = event
+        self.id = id
+        self.retry = retry
+        self.comment = comment
+
+    def encode(self) -> bytes:
+        """
+        Encode the event in the `text/event-stream` format. Multi-line data and
+        comments are split into one field per line.
+        """
+        parts: list[bytes] = []
+        if self.comment is not None:
+            for line in _SSE_LINE_BREAK.split(self.comment):
+                parts += (_SSE_COMMENT, line.encode("utf-8"), b"\n")
+        if self.id is not None:
+            parts += (_SSE_ID, self.id.encode("utf-8"), b"\n")
+        if self.event is not None:
+            parts += (_SSE_EVENT, self.event.encode("utf-8"), b"\n")
+        if self.retry is not None:
+            parts += (_SSE_RETRY, str(self.retry).encode("latin-1"), b"\n")
+        if self.data is not None:
+            for line in _SSE_LINE_BREAK.split(self.data):
+                parts += (_SSE_DATA, line.encode("utf-8"), b"\n")
+        parts.append(b"\n")
+        return b"".join(parts)
+
+
+class _EventStream:
+    """
+    A connection an `EventSourceResponse` is streaming to. Sends are
+    serialized, since pings are sent from another task than events.
+    """
+
+    def __init__(self, send: Send) -> None:
+        self.send = send
+        self.lock = anyio.Lock()
+        self.idle = True
+        self.ping_pending = False
+
+    async def send_body(self, body: bytes) -> None:
+        async with self.lock:
+            self.idle = False
+            await self.send({"type": "http.response.body", "body": body, "more_body": True})
+
+    async def send_ping(self) -> None:
+        try:
+            async with self.lock:
+                if not self.idle:
+                    # An event was sent while waiting for the lock.
+                    return
+                with anyio.CancelScope(shield=True):
+                    await self.send({"type": "http.response.body", "body": _SSE_PING, "more_body": True})
+        finally:
+            self.ping_pending = False
+
+
+class _Heartbeat:
+    """
+    A timer shared by every `EventSourceResponse` using the same ping interval
+    in the current event loop. On each tick, it pings the registered streams
+    that haven't sent anything since the previous tick.
+
+    The timer runs in the task group of one of the streams, and is moved to
+    another one when that stream ends. Each ping is sent from the task group
+    of its own stream, so a slow client doesn't hold up the others.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.streams: dict[_EventStream, TaskGroup] = {}
+        self.host: _EventStream | None = None
+        self.cancel_scope = anyio.CancelScope()
+        self.deadline = 0.0
+
+    def register(self, stream: _EventStream, task_group: TaskGroup) -> None:
+        self.streams[stream] = task_group
+        if self.host is None:
+            self.deadline = anyio.current_time() + self.interval
+            self.start_timer(stream)
+
+    def unregister(self, stream: _EventStream) -> None:
+        del self.streams[stream]
+        if stream is self.host:
+            self.cancel_scope.cancel()
+            self.host = None
+            if self.streams:
+                self.start_timer(next(iter(self.streams)))
+
+    def start_timer(self, host: _EventStream) -> None:
+        self.host = host
+        self.cancel_scope = anyio.CancelScope()
+        self.streams[host].start_soon(self.run_timer, self.cancel_scope)
+
+    async def run_timer(self, cancel_scope: anyio.CancelScope) -> None:
+        with cancel_scope:
+            while True:
+                # The deadline outlives the task, so a new host keeps the schedule.
+                await anyio.sleep(self.deadline - anyio.current_time())
+                self.deadline = anyio.current_time() + self.interval
+                self.tick()
+
+    def tick(self) -> None:
+        for stream, task_group in self.streams.items():
+            if stream.idle and not stream.ping_pending:
+                stream.ping_pending = True
+                task_group.start_soon(stream.send_ping)
+            stream.idle = True
+
+
+_heartbeats: RunVar[dict[float, _Heartbeat]] = RunVar("_heartbeats")
+
+
+def _get_heartbeat(interval: float) -> _Heartbeat:
+    heartbeats = _heartbeats.get(None)
+    if heartbeats is None:
+        heartbeats = {}
+        _heartbeats.set(heartbeats)
+    if interval not in heartbeats:
+        heartbeats[interval] = _Heartbeat(interval)
+    return heartbeats[interval]
+
+
+EventContent = Union[ServerSentEvent, str]
+EventStream = Union[AsyncIterable[EventContent], Iterable[EventContent]]
+
+
+class EventSourceResponse(StreamingResponse):
+    body_iterator: AsyncIterator[bytes]
+    media_type = "text/event-stream"
+
+    def __init__(
+        self,
+        content: EventStream | Callable[[str | None], EventStream],
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        background: BackgroundTask | None = None,
+        ping_interval: float | None = 15,
+    ) -> None:
+        super().__init__(self.encode_events(content), status_code, headers, background=background)
+        self.content = content
+        self.ping_interval = ping_interval
+        self.last_event_id: str | None = None
+        self.headers.setdefault("cache-control", "no-cache")
+        self.headers.setdefault("x-accel-buffering", "no")
+
+    async def encode_events(self, events: EventStream | Callable[[str | None], EventStream]) -> AsyncIterator[bytes]:
+        if not isinstance(events, (AsyncIterable, Iterable)):
+            # Only called once the response is sent, when the `Last-Event-ID` header is known.
+            events = events(self.last_event_id)
+        if isinstance(events, str):
+            # A string is a single event, rather than an iterable of characters.
+            events = [events]
+        if not isinstance(events, AsyncIterable):
+            events = iterate_in_threadpool(events)
+        async for event in events:
+            if isinstance(event, str):
+                event = ServerSentEvent(event)
+            yield event.encode()
+
+    async def stream_response(self, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        stream = _EventStream(send)
+        if self.ping_interval is None:
+            async for chunk in self.body_iterator:
+                await stream.send_body(chunk)
+        else:
+            heartbeat = _get_heartbeat(self.ping_interval)
+            with collapse_excgroups():
+                async with anyio.create_task_group() as task_group:
+                    heartbeat.register(stream, task_group)
+                    try:
+                        async for chunk in self.body_iterator:
+                            await stream.send_body(chunk)
+                    finally:
+                        heartbeat.unregister(stream)
+                    task_group.cancel_scope.cancel()
+
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.last_event_id = Headers(scope=scope).get("last-event-id")
+        if not isinstance(self.content, (AsyncIterable, Iterable)):
+            # The events depend on the request, so the response can be sent more than once.
+            self.body_iterator = self.encode_events(self.content)
+        await super().__call__(scope, receive, send)
+
+
+class NotModifiedResponse(Response):
+    NOT_MODIFIED_HEADERS = (
+        "cache-control",
+        "content-location",
+        "date",
+        "etag",
+        "expires",
+        "vary",
+    )
+
+    def __init__(self, headers: Headers):
+        super().__init__(
+            status_code=304,
+            headers={name: value for name, value in headers.items() if name in self.NOT_MODIFIED_HEADERS},
+        )
+
+
+def _etag_matches(etag: str, header: str, *, weak: bool) -> bool:
+    """
+    Return `True` if `etag` matches any of the entity tags listed in an
+    `If-Match` or `If-None-Match` header, using weak or strong comparison.
+    """
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if weak:
+            if tag.removeprefix("W/") == etag.removeprefix("W/"):
+                return True
+        elif tag == etag and not tag.startswith("W/"):
+            return True
+    return False
+
+
+def _is_not_modified(response_headers: Headers, request_headers: Headers) -> bool:
+    """
+    Given the request and response headers, return `True` if an HTTP
+    "Not Modified" response could be returned instead.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = response_headers.get("etag")
+        return etag is not None and _etag_matches(etag, if_none_match, weak=True)
+
+    try:
+        if_modified_since = parsedate(request_headers["if-modified-since"])
+        last_modified = parsedate(response_headers["last-modified"])
+    except KeyError:
+        return False
+    return if_modified_since is not None and last_modified is not None and if_modified_since >= last_modified
+
+
+def _is_precondition_failed(response_headers: Headers, request_headers: Headers) -> bool:
+    """
+    Return `True` if the request's `If-Match` or `If-Unmodified-Since` header
+    doesn't hold for the response.
+    """
+    if_match = request_headers.get("if-match")
+    if if_match is not None:
+        etag = response_headers.get("etag")
+        return etag is None or not _etag_matches(etag, if_match, weak=False)
+
+    try:
+        if_unmodified_since = parsedate(request_headers["if-unmodified-since"])
+        last_modified = parsedate(response_headers["last-modified"])
+    except KeyError:
+        return False
+    return if_unmodified_since is not None and last_modified is not None and last_modified > if_unmodified_since
+
+
 class MalformedRangeHeader(Exception):
     def __init__(self, content: str = "Malformed range header.") -> None:
         self.content = content
@@ -294,8 +759,40 @@ class RangeNotSatisfiable(Exception):
 _RANGE_PATTERN = re.compile(r"(\d*)-(\d*)")
 
 
+SendRange = Callable[[int, int, bool], Awaitable[None]]
+
+_STAT_CACHE_SIZE = 1024
+_stat_cache: OrderedDict[str, tuple[float, os.stat_result]] = OrderedDict()
+
+
+@lru_cache(maxsize=1024)
+def _stat_validators(mtime_ns: int, size: int) -> tuple[str, str, str]:
+    """
+    Return the `content-length`, `last-modified` and `etag` header values for a
+    file, memoized on the only stat fields they depend on.
+    """
+    # The same float as `st_mtime`, so that the `etag` doesn't change.
+    seconds, nanoseconds = divmod(mtime_ns, 1_000_000_000)
+    mtime = seconds + nanoseconds * 1e-9
+    etag_base = str(mtime) + "-" + str(size)
+    etag = f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"'
+    return str(size), formatdate(mtime, usegmt=True), etag
+
+
+def _map_file(path: str | os.PathLike[str], file_size: int) -> memoryview:
+    if file_size == 0:
+        # Empty files can't be memory-mapped.
+        return memoryview(b"")
+    with open(path, "rb") as file:
+        return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+
 class FileResponse(Response):
     chunk_size = 64 * 1024
+    max_chunk_size = 4 * 1024 * 1024
+    # When set, `os.stat` results for responses created without a `stat_result`
+    # are shared across responses, for this many seconds.
+    stat_cache_ttl: float | None = None
 
     def __init__(
         self,
@@ -308,10 +805,12 @@ class FileResponse(Response):
         stat_result: os.stat_result | None = None,
         method: str | None = None,
         content_disposition_type: str = "attachment",
+        zero_copy: bool = False,
     ) -> None:
         self.path = path
         self.status_code = status_code
         self.filename = filename
+        self.zero_copy = zero_copy
         if method is not None:
             warnings.warn(
                 "The 'method' parameter is not used, and it will be removed.",
@@ -335,10 +834,7 @@ class FileResponse(Response):
             self.set_stat_headers(stat_result)
 
     def set_stat_headers(self, stat_result: os.stat_result) -> None:
-        content_length = str(stat_result.st_size)
-        last_modified = formatdate(stat_result.st_mtime, usegmt=True)
-        etag_base = str(stat_result.st_mtime) + "-" + str(stat_result.st_size)
-        etag = f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"'
+        content_length, last_modified, etag = _stat_validators(stat_result.st_mtime_ns, stat_result.st_size)
 
         self.headers.setdefault("content-length", content_length)
         self.headers.setdefault("last-modified", last_modified)
@@ -346,11 +842,13 @@ class FileResponse(Response):
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         send_header_only: bool = scope["method"].upper() == "HEAD"
-        send_pathsend: bool = "http.response.pathsend" in scope.get("extensions", {})
+        extensions = scope.get("extensions", {})
+        send_pathsend: bool = "http.response.pathsend" in extensions
+        send_zerocopy: bool = "http.response.zerocopy" in extensions
 
         if self.stat_result is None:
             try:
-                stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+                stat_result = await self._stat()
                 self.set_stat_headers(stat_result)
             except FileNotFoundError:
                 raise RuntimeError(f"File at path {self.path} does not exist.")
@@ -362,11 +860,29 @@ class FileResponse(Response):
             stat_result = self.stat_result
 
         headers = Headers(scope=scope)
+        if self.status_code == 200:
+            # Evaluate conditional request headers, as described in RFC 9110, section 13.2.2.
+            conditional_response: Response | None = None
+            if scope["method"].upper() in ("GET", "HEAD"):
+                if _is_precondition_failed(self.headers, headers):
+                    conditional_response = PlainTextResponse("Precondition Failed", status_code=412)
+                elif _is_not_modified(self.headers, headers):
+                    conditional_response = NotModifiedResponse(self.headers)
+            elif _is_precondition_failed(self.headers, headers) or (
+                "if-none-match" in headers and _etag_matches(self.headers["etag"], headers["if-none-match"], weak=True)
+            ):
+                conditional_response = PlainTextResponse("Precondition Failed", status_code=412)
+            if conditional_response is not None:
+                await conditional_response(scope, receive, send)
+                if self.background is not None:
+                    await self.background()
+                return
+
         http_range = headers.get("range")
         http_if_range = headers.get("if-range")
 
         if http_range is None or (http_if_range is not None and not self._should_use_range(http_if_range)):
-            await self._handle_simple(send, send_header_only, send_pathsend)
+            await self._handle_simple(send, stat_result.st_size, send_header_only, send_pathsend, send_zerocopy)
         else:
             try:
                 ranges = self._parse_range_header(http_range, stat_result.st_size)
@@ -378,29 +894,44 @@ class FileResponse(Response):
 
             if len(ranges) == 1:
                 start, end = ranges[0]
-                await self._handle_single_range(send, start, end, stat_result.st_size, send_header_only)
+                await self._handle_single_range(send, start, end, stat_result.st_size, send_header_only, send_zerocopy)
             else:
-                await self._handle_multiple_ranges(send, ranges, stat_result.st_size, send_header_only)
+                await self._handle_multiple_ranges(send, ranges, stat_result.st_size, send_header_only, send_zerocopy)
 
         if self.background is not None:
             await self.background()
 
-    async def _handle_simple(self, send: Send, send_header_only: bool, send_pathsend: bool) -> None:
+    async def _stat(self) -> os.stat_result:
+        if self.stat_cache_ttl is None:
+            return await anyio.to_thread.run_sync(os.stat, self.path)
+
+        path = os.fspath(self.path)
+        now = time.monotonic()
+        cached = _stat_cache.get(path)
+        if cached is not None and cached[0] > now:
+            _stat_cache.move_to_end(path)
+            return cached[1]
+        stat_result = await anyio.to_thread.run_sync(os.stat, path)
+        _stat_cache[path] = (now + self.stat_cache_ttl, stat_result)
+        _stat_cache.move_to_end(path)
+        if len(_stat_cache) > _STAT_CACHE_SIZE:
+            _stat_cache.popitem(last=False)
+        return stat_result
+
+    async def _handle_simple(
+        self, send: Send, file_size: int, send_header_only: bool, send_pathsend: bool, send_zerocopy: bool
+    ) -> None:
         await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
         if send_header_only:
             await send({"type": "http.response.body", "body": b"", "more_body": False})
         elif send_pathsend:
             await send({"type": "http.response.pathsend", "path": str(self.path)})
         else:
-            async with await anyio.open_file(self.path, mode="rb") as file:
-                more_body = True
-                while more_body:
-                    chunk = await file.read(self.chunk_size)
-                    more_body = len(chunk) == self.chunk_size
-                    await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            async with self._open_body(send, file_size, send_zerocopy) as send_range:
+                await send_range(0, file_size, False)
 
     async def _handle_single_range(
-        self, send: Send, start: int, end: int, file_size: int, send_header_only: bool
+        self, send: Send, start: int, end: int, file_size: int, send_header_only: bool, send_zerocopy: bool
     ) -> None:
         self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
         self.headers["content-length"] = str(end - start)
@@ -408,14 +939,8 @@ class FileResponse(Response):
         if send_header_only:
             await send({"type": "http.response.body", "body": b"", "more_body": False})
         else:
-            async with await anyio.open_file(self.path, mode="rb") as file:
-                await file.seek(start)
-                more_body = True
-                while more_body:
-                    chunk = await file.read(min(self.chunk_size, end - start))
-                    start += len(chunk)
-                    more_body = len(chunk) == self.chunk_size and start < end
-                    await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            async with self._open_body(send, file_size, send_zerocopy) as send_range:
+                await send_range(start, end, False)
 
     async def _handle_multiple_ranges(
         self,
@@ -423,6 +948,7 @@ class FileResponse(Response):
         ranges: list[tuple[int, int]],
         file_size: int,
         send_header_only: bool,
+        send_zerocopy: bool,
     ) -> None:
         # In firefox and chrome, they use boundary with 95-96 bits entropy (that's roughly 13 bytes).
         boundary = token_hex(13)
@@ -435,14 +961,10 @@ class FileResponse(Response):
         if send_header_only:
             await send({"type": "http.response.body", "body": b"", "more_body": False})
         else:
-            async with await anyio.open_file(self.path, mode="rb") as file:
+            async with self._open_body(send, file_size, send_zerocopy) as send_range:
                 for start, end in ranges:
                     await send({"type": "http.response.body", "body": header_generator(start, end), "more_body": True})
-                    await file.seek(start)
-                    while start < end:
-                        chunk = await file.read(min(self.chunk_size, end - start))
-                        start += len(chunk)
-                        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                    await send_range(start, end, True)
                     await send({"type": "http.response.body", "body": b"\n", "more_body": True})
                 await send(
                     {
@@ -452,6 +974,108 @@ class FileResponse(Response):
                     }
                 )
 
+    @asynccontextmanager
+    async def _open_body(self, send: Send, file_size: int, send_zerocopy: bool) -> AsyncIterator[SendRange]:
+        """
+        Open the file, and provide a `send_range(start, end, more_body)` function
+        that sends the given byte range of it as the response body.
+
+        In zero-copy mode, the open file is handed to the server through the
+        `http.response.zerocopy` extension when it's available. Otherwise the file
+        is memory-mapped, and sent as `memoryview` slices, without copying it into
+        `bytes` objects.
+        """
+        if self.zero_copy and send_zerocopy:
+            file = await anyio.to_thread.run_sync(partial(open, self.path, mode="rb"))
+            try:
+
+                async def send_range(start: int, end: int, more_body: bool) -> None:
+                    await send(
+                        {
+                            "type": "http.response.zerocopy",
+                            "file": file,
+                            "offset": start,
+                            "count": end - start,
+                            "more_body": more_body,
+                        }
+                    )
+
+                yield send_range
+            finally:
+                file.close()
+        elif self.zero_copy:
+            view = await anyio.to_thread.run_sync(_map_file, self.path, file_size)
+
+            async def send_range(start: int, end: int, more_body: bool) -> None:
+                while True:
+                    chunk = view[start : min(start + self.chunk_size, end)]
+                    start += len(chunk)
+                    finished = start >= end or not chunk
+                    await send({"type": "http.response.body", "body": chunk, "more_body": more_body or not finished})
+                    if finished:
+                        break
+
+            yield send_range
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as async_file:
+                position = 0
+
+                async def send_range(start: int, end: int, more_body: bool) -> None:
+                    nonlocal position
+                    if start != position:
+                        await async_file.seek(start)
+                    if end - start >= 16 * self.chunk_size:
+                        position = await self._send_with_read_ahead(send, async_file, start, end, more_body)
+                        return
+                    while True:
+                        chunk = await async_file.read(min(self.chunk_size, end - start))
+                        start += len(chunk)
+                        finished = start >= end or not chunk
+                        await send(
+                            {"type": "http.response.body", "body": chunk, "more_body": more_body or not finished}
+                        )
+                        if finished:
+                            break
+                    position = start
+
+                yield send_range
+
+    async def _send_with_read_ahead(
+        self, send: Send, file: anyio.AsyncFile[bytes], start: int, end: int, more_body: bool
+    ) -> int:
+        """
+        Send a large byte range, reading the next chunk from disk while the
+        previous one is being sent. Chunks start at `chunk_size` and double in
+        size up to `max_chunk_size`. Returns the file position reached.
+        """
+        streams: anyio.create_memory_object_stream[tuple[bytes, bool]] = anyio.create_memory_object_stream()
+        send_stream, receive_stream = streams
+        finished = False
+
+        async def read_ahead() -> None:
+            position = start
+            chunk_size = self.chunk_size
+            async with send_stream:
+                while position < end:
+                    chunk = await file.read(min(chunk_size, end - position))
+                    if not chunk:
+                        break
+                    position += len(chunk)
+                    await send_stream.send((chunk, position >= end))
+                    chunk_size = min(chunk_size * 2, self.max_chunk_size)
+
+        with collapse_excgroups():
+            async with anyio.create_task_group() as task_group, receive_stream:
+                task_group.start_soon(read_ahead)
+                async for chunk, finished in receive_stream:
+                    start += len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": more_body or not finished})
+
+        if not finished:
+            # The file is shorter than expected.
+            await send({"type": "http.response.body", "body": b"", "more_body": more_body})
+        return start
+
     def _should_use_range(self, http_if_range: str) -> bool:
         return http_if_range == self.headers["last-modified"] or http_if_range == self.headers["etag"]
 
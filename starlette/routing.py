@@ -13,7 +13,7 @@ from enum import Enum
 from re import Pattern
 from typing import Any, Callable, TypeVar
 
-from starlette._exception_handler import wrap_app_handling_exceptions
+from starlette._exception_handler import ResponseStartTracker, get_exception_handlers, handle_exception
 from starlette._utils import get_route_path, is_async_callable
 from starlette.concurrency import run_in_threadpool
 from starlette.convertors import CONVERTOR_TYPES, Convertor
@@ -22,6 +22,7 @@ from starlette.exceptions import HTTPException
 from starlette.middleware import Middleware
 from starlette.requests import Request
 from starlette.responses import PlainTextResponse, RedirectResponse, Response
+from starlette.staticfiles import StaticFiles
 from starlette.types import ASGIApp, Lifespan, Receive, Scope, Send
 from starlette.websockets import WebSocket, WebSocketClose
 
@@ -70,12 +71,13 @@ def request_response(
 
     async def app(scope: Scope, receive: Receive, send: Send) -> None:
         request = Request(scope, receive, send)
-
-        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        handlers = get_exception_handlers(scope)
+        sender = ResponseStartTracker(send)
+        try:
             response = await f(request)
-            await response(scope, receive, send)
-
-        await wrap_app_handling_exceptions(app, request)(scope, receive, send)
+            await response(scope, receive, sender)
+        except Exception as exc:
+            await handle_exception(exc, request, handlers, scope, receive, sender)
 
     return app
 
@@ -90,11 +92,11 @@ def websocket_session(
 
     async def app(scope: Scope, receive: Receive, send: Send) -> None:
         session = WebSocket(scope, receive=receive, send=send)
-
-        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        handlers = get_exception_handlers(scope)
+        try:
             await func(session)
-
-        await wrap_app_handling_exceptions(app, session)(scope, receive, send)
+        except Exception as exc:
+            await handle_exception(exc, session, handlers, scope, receive, ResponseStartTracker(send))
 
     return app
 
@@ -435,6 +437,9 @@ class Mount(BaseRoute):
         if self.name is not None and name == self.name and "path" in path_params:
             # 'name' matches "<mount_name>".
             path_params["path"] = path_params["path"].lstrip("/")
+            if isinstance(self._base_app, StaticFiles):
+                # Files served with `fingerprint=True` are linked to by their fingerprinted name.
+                path_params["path"] = self._base_app.fingerprinted_path(path_params["path"])
             path, remaining_params = replace_params(self.path_format, self.param_convertors, path_params)
             if not remaining_params:
                 return URLPath(path=path)
@@ -1,41 +1,277 @@
 from __future__ import annotations
 
+import calendar
 import errno
+import gzip
+import hashlib
 import importlib.util
 import os
 import stat
-from email.utils import parsedate
-from typing import Union
+import struct
+import tarfile
+import time
+import warnings
+import zipfile
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from email.utils import formatdate
+from functools import partial
+from typing import Callable, NamedTuple, Union
 
 import anyio
 import anyio.to_thread
 
-from starlette._utils import get_route_path
+from starlette._utils import get_route_path, negotiate_encodings
 from starlette.datastructures import URL, Headers
 from starlette.exceptions import HTTPException
-from starlette.responses import FileResponse, RedirectResponse, Response
+from starlette.responses import (
+    FileResponse,
+    NotModifiedResponse as NotModifiedResponse,  # Moved to `starlette.responses`.
+    RedirectResponse,
+    Response,
+    SendRange,
+    _is_not_modified,
+    _map_file,
+)
 from starlette.types import Receive, Scope, Send
 
+try:
+    import brotli  # type: ignore[import-not-found,unused-ignore]
+except ModuleNotFoundError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard  # type: ignore[import-not-found,unused-ignore]
+except ModuleNotFoundError:  # pragma: no cover
+    zstandard = None
+
 PathLike = Union[str, "os.PathLike[str]"]
 
+_LOOKUP_CACHE_SIZE = 1024
+
+# Sidecar file extensions for precompressed files, in order of preference.
+PRECOMPRESSED_EXTENSIONS = {"br": ".br", "zstd": ".zst", "gzip": ".gz"}
+
+
+class _Fingerprint(NamedTuple):
+    path: str
+    digest: str
+    mtime_ns: int
+    size: int
+
+
+class _CachedFile:
+    """
+    The contents and pre-built response headers of a small static file.
+    """
 
-class NotModifiedResponse(Response):
-    NOT_MODIFIED_HEADERS = (
-        "cache-control",
-        "content-location",
-        "date",
-        "etag",
-        "expires",
-        "vary",
-    )
-
-    def __init__(self, headers: Headers):
-        super().__init__(
-            status_code=304,
-            headers={name: value for name, value in headers.items() if name in self.NOT_MODIFIED_HEADERS},
+    def __init__(self, response: FileResponse, stat_result: os.stat_result, content: bytes) -> None:
+        assert response.stat_result is not None
+        self.path = response.path
+        self.media_type = response.media_type
+        self.raw_headers = response.raw_headers
+        self.response_stat_result = response.stat_result
+        # The result of `lookup_path`, which differs from the response's when a
+        # precompressed sidecar file is served.
+        self.stat_result = stat_result
+        self.content = content
+        self.checked_at = time.monotonic()
+
+    def is_current(self, stat_result: os.stat_result) -> bool:
+        return (
+            stat_result.st_mtime_ns == self.stat_result.st_mtime_ns and stat_result.st_size == self.stat_result.st_size
         )
 
 
+class _InMemoryFileResponse(FileResponse):
+    """
+    A `FileResponse` that sends the body from memory, instead of reading it from disk.
+    """
+
+    content: bytes | memoryview
+
+    async def _handle_simple(
+        self, send: Send, file_size: int, send_header_only: bool, send_pathsend: bool, send_zerocopy: bool
+    ) -> None:
+        # The body is already in memory, so don't have the server read the file.
+        await super()._handle_simple(send, file_size, send_header_only, False, send_zerocopy)
+
+    @asynccontextmanager
+    async def _open_body(self, send: Send, file_size: int, send_zerocopy: bool) -> AsyncIterator[SendRange]:
+        async def send_range(start: int, end: int, more_body: bool) -> None:
+            await send({"type": "http.response.body", "body": self.content[start:end], "more_body": more_body})
+
+        yield send_range
+
+
+class _CachedFileResponse(_InMemoryFileResponse):
+    def __init__(self, cached: _CachedFile) -> None:
+        self.path = cached.path
+        self.status_code = 200
+        self.filename = None
+        self.zero_copy = False
+        self.media_type = cached.media_type
+        self.background = None
+        self.raw_headers = list(cached.raw_headers)
+        self.stat_result = cached.response_stat_result
+        self.content = cached.content
+
+
+class _BundleMember(NamedTuple):
+    path: str
+    offset: int
+    # Built from the archive's metadata, for the parts of `StaticFiles` that expect `os.stat()` results.
+    stat_result: os.stat_result
+    etag: str
+    last_modified: str
+
+
+class _BundleFileResponse(_InMemoryFileResponse):
+    def __init__(self, member: _BundleMember, content: memoryview, status_code: int = 200) -> None:
+        self.member = member
+        super().__init__(member.path, status_code=status_code, stat_result=member.stat_result)
+        self.content = content
+
+    def set_stat_headers(self, stat_result: os.stat_result) -> None:
+        self.headers.setdefault("content-length", str(stat_result.st_size))
+        self.headers.setdefault("last-modified", self.member.last_modified)
+        self.headers.setdefault("etag", self.member.etag)
+
+
+def _load_bundle(bundle: PathLike) -> tuple[memoryview, dict[str, _BundleMember]]:
+    """
+    Memory-map an uncompressed zip or tar archive, and index its members by path.
+    """
+    view = _map_file(bundle, os.path.getsize(bundle))
+    members: dict[str, _BundleMember] = {}
+
+    def add_member(name: str, offset: int, size: int, mtime: float, etag: str, mode: int = stat.S_IFREG) -> None:
+        path = os.path.normpath(name)
+        if path.startswith("..") or os.path.isabs(path):
+            return
+        stat_result = os.stat_result((mode | 0o444, 0, 0, 1, 0, 0, size, mtime, mtime, mtime))
+        members[path] = _BundleMember(path, offset, stat_result, etag, formatdate(mtime, usegmt=True))
+        parent = os.path.dirname(path) or "."
+        if path != "." and parent not in members:
+            add_member(parent, 0, 0, mtime, "", mode=stat.S_IFDIR)
+
+    if zipfile.is_zipfile(bundle):
+        with zipfile.ZipFile(bundle) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                if info.compress_type != zipfile.ZIP_STORED:
+                    raise RuntimeError(f"StaticFiles bundle member '{info.filename}' is compressed.")
+                # The data follows the local file header, whose name and extra field can differ
+                # in length from the ones in the central directory.
+                name_length, extra_length = struct.unpack_from("<HH", view, info.header_offset + 26)
+                offset = info.header_offset + 30 + name_length + extra_length
+                mtime = calendar.timegm((*info.date_time, 0, 0, 0))
+                add_member(info.filename, offset, info.file_size, mtime, f'"{info.CRC:08x}-{info.file_size:x}"')
+        return view, members
+
+    try:
+        with tarfile.open(bundle, "r:") as tar_archive:
+            for tar_info in tar_archive:
+                if tar_info.isfile():
+                    etag = f'"{tar_info.chksum:x}-{tar_info.size:x}"'
+                    add_member(tar_info.name, tar_info.offset_data, tar_info.size, tar_info.mtime, etag)
+    except tarfile.ReadError:
+        raise RuntimeError(f"StaticFiles bundle '{bundle}' is not an uncompressed zip or tar archive.")
+    return view, members
+
+
+def _read_file(path: PathLike) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def _find_precompressed(
+    full_path: str, encodings: Sequence[str], directories: Sequence[str] | None
+) -> tuple[str, str, os.stat_result] | None:
+    """
+    Return the most preferred sidecar file among `encodings`. Unless
+    `directories` is `None`, symbolic links are resolved and the sidecar file
+    must be inside one of them, as in `StaticFiles.lookup_path`.
+    """
+    for encoding in encodings:
+        sidecar_path = full_path + PRECOMPRESSED_EXTENSIONS[encoding]
+        if directories is not None:
+            sidecar_path = os.path.realpath(sidecar_path)
+            if not any(os.path.commonpath([sidecar_path, directory]) == directory for directory in directories):
+                continue
+        try:
+            stat_result = os.stat(sidecar_path)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        if stat.S_ISREG(stat_result.st_mode):
+            return encoding, sidecar_path, stat_result
+    return None
+
+
+def _hash_file(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(partial(file.read, 64 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _compressor(encoding: str) -> Callable[[bytes], bytes]:
+    if encoding == "br":  # pragma: no cover
+        assert brotli is not None, "The `brotli` library must be installed to precompress files with brotli."
+        return partial(brotli.compress, quality=11)
+    if encoding == "zstd":  # pragma: no cover
+        assert zstandard is not None, "The `zstandard` library must be installed to precompress files with zstd."
+        return zstandard.ZstdCompressor(level=19).compress  # type: ignore[no-any-return,unused-ignore]
+    return partial(gzip.compress, compresslevel=9, mtime=0)
+
+
+def precompress(directory: PathLike, encodings: Sequence[str] = ("gzip",), minimum_size: int = 1024) -> list[str]:
+    """
+    Write precompressed sidecar files next to the files in `directory`, for
+    `StaticFiles(precompressed=True)` to serve. Meant to be run at build time.
+
+    Files smaller than `minimum_size` bytes are skipped, as are sidecars that
+    wouldn't be smaller than the original file. Sidecars that are newer than
+    their file are left as they are. Returns the paths of the files written.
+    """
+    for encoding in encodings:
+        assert encoding in PRECOMPRESSED_EXTENSIONS, f"Unsupported encoding {encoding!r}."
+    compressors = {PRECOMPRESSED_EXTENSIONS[encoding]: _compressor(encoding) for encoding in encodings}
+    sidecar_extensions = tuple(PRECOMPRESSED_EXTENSIONS.values())
+
+    written = []
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            if filename.endswith(sidecar_extensions) or os.path.getsize(path) < minimum_size:
+                continue
+            mtime = os.path.getmtime(path)
+            sidecars = [(path + extension, compress) for extension, compress in compressors.items()]
+            outdated = [
+                (sidecar_path, compress)
+                for sidecar_path, compress in sidecars
+                if not os.path.exists(sidecar_path) or os.path.getmtime(sidecar_path) < mtime
+            ]
+            if not outdated:
+                continue
+            with open(path, "rb") as file:
+                content = file.read()
+            for sidecar_path, compress in outdated:
+                compressed = compress(content)
+                if len(compressed) >= len(content):
+                    if os.path.exists(sidecar_path):
+                        # Don't leave a stale sidecar behind.
+                        os.remove(sidecar_path)
+                    continue
+                with open(sidecar_path, "wb") as file:
+                    file.write(compressed)
+                written.append(sidecar_path)
+    return written
+
+
 class StaticFiles:
     def __init__(
         self,
@@ -45,6 +281,14 @@ class StaticFiles:
         html: bool = False,
         check_dir: bool = True,
         follow_symlink: bool = False,
+        cache_size: int = 0,
+        cache_max_file_size: int = 64 * 1024,
+        cache_revalidate_interval: float = 1.0,
+        lookup_cache_ttl: float | None = None,
+        precompressed: bool = False,
+        fingerprint: bool = False,
+        indexed: bool = False,
+        bundle: PathLike | None = None,
     ) -> None:
         self.directory = directory
         self.packages = packages
@@ -52,8 +296,62 @@ class StaticFiles:
         self.html = html
         self.config_checked = False
         self.follow_symlink = follow_symlink
+        self.cache_size = cache_size
+        self.cache_max_file_size = min(cache_max_file_size, cache_size)
+        self.cache_revalidate_interval = cache_revalidate_interval
+        self.file_cache: OrderedDict[tuple[str, tuple[str, ...]], _CachedFile] = OrderedDict()
+        self.file_cache_bytes = 0
+        self.lookup_cache_ttl = lookup_cache_ttl
+        self.lookup_cache: OrderedDict[str, tuple[float, str, os.stat_result | None]] = OrderedDict()
+        self.missing_lookup_cache: OrderedDict[str, tuple[float, str, os.stat_result | None]] = OrderedDict()
+        self.resolved_directories: list[str] | None = None
+        self.precompressed = precompressed
+        self.indexed = indexed
+        self.index: dict[str, tuple[str, os.stat_result]] | None = None
+        self.bundle = bundle
+        self.bundle_view = memoryview(b"")
+        self.bundle_members: dict[str, _BundleMember] | None = None
+        if bundle is not None:
+            assert directory is None and packages is None, "'bundle' can't be used with 'directory' or 'packages'."
+            assert not (precompressed or fingerprint), "'bundle' can't be used with 'precompressed' or 'fingerprint'."
+            self.bundle_view, self.bundle_members = _load_bundle(bundle)
         if check_dir and directory is not None and not os.path.isdir(directory):
             raise RuntimeError(f"Directory '{directory}' does not exist")
+        self.fingerprint = fingerprint
+        self.manifest: dict[str, str] = {}
+        self.fingerprints: dict[str, _Fingerprint] = {}
+        if fingerprint:
+            self.build_manifest()
+
+    def build_manifest(self) -> None:
+        """
+        Hash the contents of every file, and map each file's path to a
+        fingerprinted name that includes the hash, such as `app.3f9a1c2b.js`
+        for `app.js`.
+        """
+        for directory in self.all_directories:
+            for root, _, filenames in os.walk(directory):
+                for filename in filenames:
+                    full_path = os.path.join(root, filename)
+                    path = os.path.relpath(full_path, directory).replace(os.sep, "/")
+                    if path in self.manifest:
+                        # The file is shadowed by one in an earlier directory.
+                        continue
+                    stat_result = os.stat(full_path)
+                    digest = _hash_file(full_path)
+                    base, extension = os.path.splitext(path)
+                    fingerprinted = f"{base}.{digest[:8]}{extension}"
+                    self.manifest[path] = fingerprinted
+                    self.fingerprints[os.path.normpath(fingerprinted)] = _Fingerprint(
+                        os.path.normpath(path), digest, stat_result.st_mtime_ns, stat_result.st_size
+                    )
+
+    def fingerprinted_path(self, path: str) -> str:
+        """
+        Return the fingerprinted name for the given path, if there is one.
+        Used by `url_for()` for the `Mount` that this app is on.
+        """
+        return self.manifest.get(path, path)
 
     def get_directories(
         self,
@@ -113,8 +411,24 @@ class StaticFiles:
         if scope["method"] not in ("GET", "HEAD"):
             raise HTTPException(status_code=405)
 
+        encodings: tuple[str, ...] = ()
+        if self.precompressed:
+            accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+            encodings = negotiate_encodings(accept_encoding, tuple(PRECOMPRESSED_EXTENSIONS))
+        cache_key = (path, encodings)
+
+        cached = self.file_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached.checked_at < self.cache_revalidate_interval:
+            # A hot file that has been checked against the disk recently.
+            self.file_cache.move_to_end(cache_key)
+            return _CachedFileResponse(cached)
+
+        fingerprint = self.fingerprints.get(path)
+        if fingerprint is not None:
+            path = fingerprint.path
+
         try:
-            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+            full_path, stat_result = await self.cached_lookup_path(path)
         except PermissionError:
             raise HTTPException(status_code=401)
         except OSError as exc:
@@ -124,40 +438,91 @@ class StaticFiles:
 
             raise exc
 
+        if cached is not None:
+            self._cache_evict(cache_key)
+
         if stat_result and stat.S_ISREG(stat_result.st_mode):
             # We have a static file to serve.
-            return self.file_response(full_path, stat_result, scope)
+            if cached is not None and cached.is_current(stat_result):
+                cached.checked_at = time.monotonic()
+                self._cache_store(cache_key, cached)
+                return _CachedFileResponse(cached)
+            response = await self.precompressed_response(full_path, stat_result, scope, encodings)
+            if fingerprint is not None and isinstance(response, FileResponse):
+                self.set_fingerprint_headers(response, fingerprint, stat_result)
+            if self.cache_size:
+                return await self.cache_response(cache_key, response, stat_result)
+            return response
 
         elif stat_result and stat.S_ISDIR(stat_result.st_mode) and self.html:
             # We're in HTML mode, and have got a directory URL.
             # Check if we have 'index.html' file to serve.
             index_path = os.path.join(path, "index.html")
-            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, index_path)
+            full_path, stat_result = await self.cached_lookup_path(index_path)
             if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
                 if not scope["path"].endswith("/"):
                     # Directory URLs should redirect to always end in "/".
                     url = URL(scope=scope)
                     url = url.replace(path=url.path + "/")
                     return RedirectResponse(url=url)
-                return self.file_response(full_path, stat_result, scope)
+                return await self.precompressed_response(full_path, stat_result, scope, encodings)
 
         if self.html:
             # Check for '404.html' if we're in HTML mode.
-            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, "404.html")
+            full_path, stat_result = await self.cached_lookup_path("404.html")
             if stat_result and stat.S_ISREG(stat_result.st_mode):
+                if self.bundle_members is not None:
+                    return self.bundle_response(full_path, status_code=404)
                 return FileResponse(full_path, stat_result=stat_result, status_code=404)
         raise HTTPException(status_code=404)
 
+    async def cached_lookup_path(self, path: str) -> tuple[str, os.stat_result | None]:
+        """
+        Call `lookup_path` in the thread pool, reusing its results for
+        `lookup_cache_ttl` seconds, if set. Both caches are bounded LRUs, and
+        missing files are cached in their own, so that requests for many
+        missing files don't evict the files that exist.
+
+        In indexed mode, the index is used instead, and in bundle mode, the
+        bundle's members.
+        """
+        if self.bundle_members is not None:
+            member = self.bundle_members.get(os.path.normpath(path))
+            return ("", None) if member is None else (member.path, member.stat_result)
+        if self.index is not None:
+            return self.index.get(os.path.normpath(path), ("", None))
+        if self.lookup_cache_ttl is None:
+            return await anyio.to_thread.run_sync(self.lookup_path, path)
+
+        now = time.monotonic()
+        for cache in (self.lookup_cache, self.missing_lookup_cache):
+            cached = cache.get(path)
+            if cached is not None and cached[0] > now:
+                cache.move_to_end(path)
+                return cached[1], cached[2]
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        if stat_result is None:
+            cache, stale = self.missing_lookup_cache, self.lookup_cache
+        else:
+            cache, stale = self.lookup_cache, self.missing_lookup_cache
+        stale.pop(path, None)
+        cache[path] = (now + self.lookup_cache_ttl, full_path, stat_result)
+        cache.move_to_end(path)
+        if len(cache) > _LOOKUP_CACHE_SIZE:
+            cache.popitem(last=False)
+        return full_path, stat_result
+
     def lookup_path(self, path: str) -> tuple[str, os.stat_result | None]:
-        for directory in self.all_directories:
+        directories = self.resolved_directories
+        if directories is None:
+            directories = self.resolve_directories()
+        for directory in directories:
             joined_path = os.path.join(directory, path)
             if self.follow_symlink:
                 full_path = os.path.abspath(joined_path)
-                directory = os.path.abspath(directory)
             else:
                 full_path = os.path.realpath(joined_path)
-                directory = os.path.realpath(directory)
-            if os.path.commonpath([full_path, directory]) != str(directory):
+            if os.path.commonpath([full_path, directory]) != directory:
                 # Don't allow misbehaving clients to break out of the static files directory.
                 continue
             try:
@@ -166,6 +531,86 @@ class StaticFiles:
                 continue
         return "", None
 
+    async def precompressed_response(
+        self, full_path: str, stat_result: os.stat_result, scope: Scope, encodings: Sequence[str]
+    ) -> Response:
+        """
+        Return the `file_response()` for the given file. In precompressed mode, it
+        sends the contents of the most preferred sidecar file among `encodings`
+        instead, if one exists.
+        """
+        response = self.file_response(full_path, stat_result, scope)
+        if not self.precompressed or not isinstance(response, FileResponse):
+            return response
+
+        response.headers.add_vary_header("Accept-Encoding")
+        if encodings:
+            directories = None if self.follow_symlink else self.resolved_directories or self.resolve_directories()
+            sidecar = await anyio.to_thread.run_sync(_find_precompressed, full_path, encodings, directories)
+            if sidecar is not None:
+                encoding, response.path, response.stat_result = sidecar
+                for key in ("content-length", "last-modified", "etag"):
+                    del response.headers[key]
+                response.set_stat_headers(response.stat_result)
+                response.headers["content-encoding"] = encoding
+        return response
+
+    def set_fingerprint_headers(
+        self, response: FileResponse, fingerprint: _Fingerprint, stat_result: os.stat_result
+    ) -> None:
+        """
+        Mark the response to a fingerprinted path as cacheable forever, with an
+        entity tag derived from the file's content hash.
+        """
+        if stat_result.st_mtime_ns != fingerprint.mtime_ns or stat_result.st_size != fingerprint.size:
+            # The file changed since the manifest was built, so the hash no longer applies.
+            return
+        response.headers["cache-control"] = "public, max-age=31536000, immutable"
+        encoding = response.headers.get("content-encoding")
+        if encoding is None:
+            response.headers["etag"] = f'"{fingerprint.digest}"'
+        else:
+            response.headers["etag"] = f'"{fingerprint.digest}-{encoding}"'
+
+    async def cache_response(
+        self, key: tuple[str, tuple[str, ...]], response: Response, stat_result: os.stat_result
+    ) -> Response:
+        """
+        Read a small file into memory, and keep it in the cache along with the
+        headers of the given response.
+        """
+        if (
+            type(response) is not FileResponse
+            or response.status_code != 200
+            or response.background is not None
+            or response.stat_result is None
+            or response.stat_result.st_size > self.cache_max_file_size
+        ):
+            return response
+        try:
+            content = await anyio.to_thread.run_sync(_read_file, response.path)
+        except OSError:
+            return response
+        if len(content) != response.stat_result.st_size:
+            # The file changed while we were reading it.
+            return response
+        cached = _CachedFile(response, stat_result, content)
+        self._cache_store(key, cached)
+        return _CachedFileResponse(cached)
+
+    def _cache_store(self, key: tuple[str, tuple[str, ...]], cached: _CachedFile) -> None:
+        self._cache_evict(key)
+        self.file_cache[key] = cached
+        self.file_cache_bytes += len(cached.content)
+        while self.file_cache_bytes > self.cache_size:
+            _, evicted = self.file_cache.popitem(last=False)
+            self.file_cache_bytes -= len(evicted.content)
+
+    def _cache_evict(self, key: tuple[str, tuple[str, ...]]) -> None:
+        cached = self.file_cache.pop(key, None)
+        if cached is not None:
+            self.file_cache_bytes -= len(cached.content)
+
     def file_response(
         self,
         full_path: PathLike,
@@ -173,48 +618,84 @@ class StaticFiles:
         scope: Scope,
         status_code: int = 200,
     ) -> Response:
-        request_headers = Headers(scope=scope)
+        if self.bundle_members is not None:
+            return self.bundle_response(os.fspath(full_path), status_code=status_code)
+        return FileResponse(full_path, status_code=status_code, stat_result=stat_result)
 
-        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
-        if self.is_not_modified(response.headers, request_headers):
-            return NotModifiedResponse(response.headers)
-        return response
+    def bundle_response(self, path: str, status_code: int = 200) -> Response:
+        """
+        Return a response that sends a member of the bundle, as a slice of the
+        memory-mapped archive.
+        """
+        assert self.bundle_members is not None
+        member = self.bundle_members[path]
+        content = self.bundle_view[member.offset : member.offset + member.stat_result.st_size]
+        return _BundleFileResponse(member, content, status_code=status_code)
+
+    def resolve_directories(self) -> list[str]:
+        """
+        Return the absolute paths of all the directories, with symbolic links
+        resolved unless `follow_symlink` is set.
+        """
+        if self.follow_symlink:
+            return [os.path.abspath(directory) for directory in self.all_directories]
+        return [os.path.realpath(directory) for directory in self.all_directories]
 
     async def check_config(self) -> None:
         """
         Perform a one-off configuration check that StaticFiles is actually
         pointed at a directory, so that we can raise loud errors rather than
         just returning 404 responses.
+
+        Also resolves the directory paths once, so that `lookup_path`
+        doesn't have to on every request, and builds the index in indexed mode.
         """
-        if self.directory is None:
-            return
+        self.resolved_directories = await anyio.to_thread.run_sync(self.resolve_directories)
+        if self.directory is not None:
+            try:
+                stat_result = await anyio.to_thread.run_sync(os.stat, self.directory)
+            except FileNotFoundError:
+                raise RuntimeError(f"StaticFiles directory '{self.directory}' does not exist.")
+            if not (stat.S_ISDIR(stat_result.st_mode) or stat.S_ISLNK(stat_result.st_mode)):
+                raise RuntimeError(f"StaticFiles path '{self.directory}' is not a directory.")
 
-        try:
-            stat_result = await anyio.to_thread.run_sync(os.stat, self.directory)
-        except FileNotFoundError:
-            raise RuntimeError(f"StaticFiles directory '{self.directory}' does not exist.")
-        if not (stat.S_ISDIR(stat_result.st_mode) or stat.S_ISLNK(stat_result.st_mode)):
-            raise RuntimeError(f"StaticFiles path '{self.directory}' is not a directory.")
+        if self.indexed:
+            self.index = await anyio.to_thread.run_sync(self.build_index)
+
+    def build_index(self) -> dict[str, tuple[str, os.stat_result]]:
+        """
+        Walk all the directories, and return the result of `lookup_path` for
+        every file and directory in them, keyed by path.
+        """
+        index: dict[str, tuple[str, os.stat_result]] = {}
+        for directory in self.all_directories:
+            paths = ["."]
+            for root, dirnames, filenames in os.walk(directory, followlinks=self.follow_symlink):
+                paths.extend(os.path.relpath(os.path.join(root, name), directory) for name in dirnames + filenames)
+            for path in paths:
+                if path in index:
+                    # Files in earlier directories take precedence, as in `lookup_path`.
+                    continue
+                try:
+                    full_path, stat_result = self.lookup_path(path)
+                except OSError:
+                    continue
+                if stat_result is not None:
+                    index[path] = (full_path, stat_result)
+        return index
 
     def is_not_modified(self, response_headers: Headers, request_headers: Headers) -> bool:
         """
         Given the request and response headers, return `True` if an HTTP
         "Not Modified" response could be returned instead.
-        """
-        try:
-            if_none_match = request_headers["if-none-match"]
-            etag = response_headers["etag"]
-            if etag in [tag.strip(" W/") for tag in if_none_match.split(",")]:
-                return True
-        except KeyError:
-            pass
 
-        try:
-            if_modified_since = parsedate(request_headers["if-modified-since"])
-            last_modified = parsedate(response_headers["last-modified"])
-            if if_modified_since is not None and last_modified is not None and if_modified_since >= last_modified:
-                return True
-        except KeyError:
-            pass
-
-        return False
+        Deprecated: conditional requests are evaluated by `FileResponse` when it
+        is sent, so `StaticFiles` no longer calls this method, and overriding it
+        has no effect.
+        """
+        warnings.warn(
+            "StaticFiles.is_not_modified is deprecated, and will be removed in version 1.0.0. "
+            "Conditional requests are evaluated by FileResponse.",
+            DeprecationWarning,
+        )
+        return _is_not_modified(response_headers, request_headers)
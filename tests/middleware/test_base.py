@@ -13,7 +13,7 @@ from anyio.abc import TaskStatus
 from starlette.applications import Starlette
 from starlette.background import BackgroundTask
 from starlette.middleware import Middleware, _MiddlewareFactory
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.middleware.base import BaseHTTPMiddleware, InlineHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import ClientDisconnect, Request
 from starlette.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
 from starlette.routing import Route, WebSocketRoute
@@ -216,10 +216,25 @@ class CustomMiddlewareUsingBaseHTTPMiddleware(BaseHTTPMiddleware):
         return resp  # pragma: no cover
 
 
+class CustomMiddlewareUsingInlineHTTPMiddleware(InlineHTTPMiddleware):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await super().__call__(scope, receive, send)
+        assert ctxvar.get() == "set by endpoint"
+
+    async def dispatch(
+        self,
+        request: Request,
+        call_next: RequestResponseEndpoint,
+    ) -> Response:
+        ctxvar.set("set by middleware")
+        return await call_next(request)
+
+
 @pytest.mark.parametrize(
     "middleware_cls",
     [
         CustomMiddlewareWithoutBaseHTTPMiddleware,
+        CustomMiddlewareUsingInlineHTTPMiddleware,
         pytest.param(
             CustomMiddlewareUsingBaseHTTPMiddleware,
             marks=pytest.mark.xfail(
@@ -1243,3 +1258,386 @@ async def test_asgi_pathsend_events(tmpdir: Path) -> None:
     assert len(events) == 2
     assert events[0]["type"] == "http.response.start"
     assert events[1]["type"] == "http.response.pathsend"
+
+
+class CustomInlineMiddleware(InlineHTTPMiddleware):
+    async def dispatch(
+        self,
+        request: Request,
+        call_next: RequestResponseEndpoint,
+    ) -> Response:
+        response = await call_next(request)
+        response.headers["Custom-Header"] = "Example"
+        return response
+
+
+def test_inline_middleware(test_client_factory: TestClientFactory) -> None:
+    app = Starlette(
+        routes=[
+            Route("/", endpoint=homepage),
+            Route("/exc", endpoint=exc),
+            Route("/exc-stream", endpoint=exc_stream),
+            Route("/no-response", endpoint=NoResponse),
+            WebSocketRoute("/ws", endpoint=websocket_endpoint),
+        ],
+        middleware=[Middleware(CustomInlineMiddleware)],
+    )
+    client = test_client_factory(app)
+    response = client.get("/")
+    assert response.text == "Homepage"
+    assert response.headers["Custom-Header"] == "Example"
+    assert response.headers["Content-Length"] == "8"
+
+    with pytest.raises(Exception) as ctx:
+        response = client.get("/exc")
+    assert str(ctx.value) == "Exc"
+
+    with pytest.raises(Exception) as ctx:
+        response = client.get("/exc-stream")
+    assert str(ctx.value) == "Faulty Stream"
+
+    with pytest.raises(RuntimeError, match="No response returned."):
+        response = client.get("/no-response")
+
+    with client.websocket_connect("/ws") as session:
+        text = session.receive_text()
+        assert text == "Hello, world!"
+
+
+@pytest.mark.anyio
+async def test_inline_middleware_streaming_response() -> None:
+    events: list[Message] = []
+
+    async def endpoint(request: Request) -> StreamingResponse:
+        async def generator() -> AsyncGenerator[bytes, None]:
+            for chunk in (b"Hello, ", b"world", b"!"):
+                yield chunk
+                # Each chunk is sent before the next one is produced.
+                assert events[-1]["body"] == chunk
+
+        response = StreamingResponse(generator(), media_type="text/plain", headers={"Vary": "Cookie"})
+        response.set_cookie("endpoint", "1")
+        return response
+
+    async def dispatch(request: Request, call_next: RequestResponseEndpoint) -> Response:
+        response = await call_next(request)
+        assert not events
+        response.status_code = 201
+        response.headers["Content-Type"] = "text/csv"
+        response.headers.add_vary_header("Accept")
+        response.set_cookie("middleware", "1")
+        return response
+
+    app = Starlette(
+        routes=[Route("/", endpoint=endpoint)],
+        middleware=[Middleware(InlineHTTPMiddleware, dispatch=dispatch)],
+    )
+
+    async def receive() -> Message:
+        await anyio.sleep_forever()
+        raise NotImplementedError()  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        events.append(message)
+
+    await app({"type": "http", "method": "GET", "path": "/", "headers": []}, receive, send)
+
+    assert events[0]["status"] == 201
+    headers = events[0]["headers"]
+    assert [value for key, value in headers if key == b"content-type"] == [b"text/csv"]
+    assert [value for key, value in headers if key == b"vary"] == [b"Cookie", b"Accept"]
+    assert [value.split(b"=")[0] for key, value in headers if key == b"set-cookie"] == [b"endpoint", b"middleware"]
+    assert [event.get("body") for event in events[1:]] == [b"Hello, ", b"world", b"!", b""]
+
+
+def test_inline_middleware_status_code_and_headers_are_unknown(test_client_factory: TestClientFactory) -> None:
+    async def dispatch(request: Request, call_next: RequestResponseEndpoint) -> Response:
+        response = await call_next(request)
+        with pytest.raises(RuntimeError, match="The status code isn't known until the response is sent."):
+            response.status_code
+        for read in (
+            lambda: response.headers["content-type"],
+            lambda: response.headers.get("content-type"),
+            lambda: "content-type" in response.headers,
+            lambda: dict(response.headers),
+            lambda: response.headers.getlist("vary"),
+            lambda: response.headers.setdefault("vary", "Origin"),
+            lambda: response.headers == response.headers,
+            lambda: response.headers.mutablecopy(),
+            lambda: response.headers.values(),
+            lambda: response.headers.items(),
+            lambda: list(response.headers),
+            lambda: len(response.headers),
+        ):
+            with pytest.raises(RuntimeError, match="The response headers aren't known until the response is sent"):
+                read()
+        with pytest.raises(RuntimeError, match="The response headers aren't known until the response is sent"):
+            del response.headers["content-type"]
+
+        response.status_code = 201
+        response.headers["X-Middleware"] = "1"
+        assert response.status_code == 201
+        assert repr(response.headers) == "_PendingHeaders(raw=[(b'x-middleware', b'1')])"
+        return response
+
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage)],
+        middleware=[Middleware(InlineHTTPMiddleware, dispatch=dispatch)],
+    )
+    client = test_client_factory(app)
+    response = client.get("/")
+    assert response.status_code == 201
+    assert response.headers["X-Middleware"] == "1"
+    assert response.text == "Homepage"
+
+
+def test_inline_middleware_merges_vary_header(test_client_factory: TestClientFactory) -> None:
+    async def endpoint(request: Request) -> Response:
+        return PlainTextResponse("Endpoint", headers={"Vary": "Accept-Encoding"})
+
+    async def dispatch(request: Request, call_next: RequestResponseEndpoint) -> Response:
+        response = await call_next(request)
+        response.headers.add_vary_header("Origin")
+        return response
+
+    app = Starlette(
+        routes=[Route("/", endpoint=endpoint)],
+        middleware=[Middleware(InlineHTTPMiddleware, dispatch=dispatch)],
+    )
+    client = test_client_factory(app)
+    assert client.get("/").headers["Vary"] == "Accept-Encoding, Origin"
+
+
+def test_inline_middleware_background_task(test_client_factory: TestClientFactory) -> None:
+    calls: list[str] = []
+
+    async def endpoint(request: Request) -> Response:
+        calls.append("endpoint")
+        return PlainTextResponse("Endpoint")
+
+    async def dispatch(request: Request, call_next: RequestResponseEndpoint) -> Response:
+        response = await call_next(request)
+        response.background = BackgroundTask(calls.append, "background")
+        return response
+
+    app = Starlette(
+        routes=[Route("/", endpoint=endpoint)],
+        middleware=[Middleware(InlineHTTPMiddleware, dispatch=dispatch)],
+    )
+    client = test_client_factory(app)
+    assert client.get("/").text == "Endpoint"
+    assert calls == ["endpoint", "background"]
+
+
+def test_inline_middleware_exception_is_raised_when_sending(test_client_factory: TestClientFactory) -> None:
+    calls: list[str] = []
+
+    async def dispatch(request: Request, call_next: RequestResponseEndpoint) -> Response:
+        try:
+            response = await call_next(request)
+        except Exception:  # pragma: no cover
+            calls.append("caught")
+            raise
+        calls.append("dispatch")
+        return response
+
+    app = Starlette(
+        routes=[Route("/exc", endpoint=exc)],
+        middleware=[Middleware(InlineHTTPMiddleware, dispatch=dispatch)],
+    )
+    client = test_client_factory(app)
+    # The app only runs once dispatch has returned, so call_next never raises.
+    with pytest.raises(Exception, match="Exc"):
+        client.get("/exc")
+    assert calls == ["dispatch"]
+
+
+def test_inline_middleware_replaced_response(test_client_factory: TestClientFactory) -> None:
+    calls: list[str] = []
+
+    async def endpoint(request: Request) -> Response:
+        calls.append("endpoint")  # pragma: no cover
+        return PlainTextResponse("Endpoint")  # pragma: no cover
+
+    async def dispatch(request: Request, call_next: RequestResponseEndpoint) -> Response:
+        await call_next(request)
+        return PlainTextResponse("Custom")
+
+    app = Starlette(
+        routes=[Route("/", endpoint=endpoint)],
+        middleware=[Middleware(InlineHTTPMiddleware, dispatch=dispatch)],
+    )
+    client = test_client_factory(app)
+    assert client.get("/").text == "Custom"
+    # The downstream app only runs if its response is sent.
+    assert calls == []
+
+
+def test_inline_middleware_request_body(test_client_factory: TestClientFactory) -> None:
+    async def endpoint(request: Request) -> Response:
+        return Response(await request.body())
+
+    async def dispatch(request: Request, call_next: RequestResponseEndpoint) -> Response:
+        assert await request.body() == b"a"
+        return await call_next(request)
+
+    app = Starlette(
+        routes=[Route("/", endpoint=endpoint, methods=["POST"])],
+        middleware=[Middleware(InlineHTTPMiddleware, dispatch=dispatch)],
+    )
+    client = test_client_factory(app)
+    response = client.post("/", content=b"a")
+    assert response.content == b"a"
+
+
+def test_inline_middleware_debug_info(test_client_factory: TestClientFactory) -> None:
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.debug", "info": {"template": "index.html", "context": {"a": 1}}})
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"Hello", "more_body": True})
+        await send({"type": "http.response.body", "body": b", world!"})
+
+    async def passthrough(request: Request, call_next: RequestResponseEndpoint) -> Response:
+        return await call_next(request)
+
+    client = test_client_factory(InlineHTTPMiddleware(app, dispatch=passthrough))
+    response = client.get("/")
+    assert response.text == "Hello, world!"
+    assert response.template == "index.html"  # type: ignore[attr-defined]
+    assert response.context == {"a": 1}  # type: ignore[attr-defined]
+
+
+@pytest.mark.anyio
+async def test_inline_middleware_pathsend(tmpdir: Path) -> None:
+    path = tmpdir / "example.txt"
+    with path.open("w") as file:
+        file.write("<file content>")
+
+    events: list[Message] = []
+
+    async def endpoint_with_pathsend(_: Request) -> FileResponse:
+        return FileResponse(path)
+
+    async def passthrough(request: Request, call_next: RequestResponseEndpoint) -> Response:
+        return await call_next(request)
+
+    app = Starlette(
+        middleware=[Middleware(InlineHTTPMiddleware, dispatch=passthrough)],
+        routes=[Route("/", endpoint_with_pathsend)],
+    )
+
+    scope = {
+        "type": "http",
+        "version": "3",
+        "method": "GET",
+        "path": "/",
+        "headers": [],
+        "extensions": {"http.response.pathsend": {}},
+    }
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        events.append(message)
+
+    await app(scope, receive, send)
+
+    assert len(events) == 2
+    assert events[0]["type"] == "http.response.start"
+    assert events[1] == {"type": "http.response.pathsend", "path": str(path)}
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("middleware_class", [BaseHTTPMiddleware, InlineHTTPMiddleware])
+@pytest.mark.parametrize("range_header", [None, b"bytes=0-9,20-29"])
+async def test_zerocopy_events(
+    middleware_class: type[BaseHTTPMiddleware | InlineHTTPMiddleware], range_header: bytes | None, tmpdir: Path
+) -> None:
+    path = tmpdir / "example.txt"
+    with path.open("w") as file:
+        file.write("<file content>" * 10)
+
+    events: list[Message] = []
+    body = b""
+
+    async def endpoint_with_zerocopy(_: Request) -> FileResponse:
+        return FileResponse(path, zero_copy=True)
+
+    async def passthrough(request: Request, call_next: RequestResponseEndpoint) -> Response:
+        return await call_next(request)
+
+    app = Starlette(
+        middleware=[Middleware(middleware_class, dispatch=passthrough)],
+        routes=[Route("/", endpoint_with_zerocopy)],
+    )
+
+    scope = {
+        "type": "http",
+        "version": "3",
+        "method": "GET",
+        "path": "/",
+        "headers": [] if range_header is None else [(b"range", range_header)],
+        "extensions": {"http.response.zerocopy": {}},
+    }
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        nonlocal body
+        events.append(message)
+        if message["type"] == "http.response.zerocopy":
+            file = message["file"]
+            file.seek(message["offset"])
+            body += file.read(message["count"])
+        elif message["type"] == "http.response.body":
+            body += message["body"]
+
+    await app(scope, receive, send)
+
+    assert events[0]["type"] == "http.response.start"
+    if range_header is None:
+        assert body == b"<file content>" * 10
+    else:
+        assert b"\n\n<file cont\n" in body
+        assert b"\n\ncontent><f\n" in body
+    assert "http.response.zerocopy" in {event["type"] for event in events}
+
+
+@pytest.mark.anyio
+async def test_zerocopy_response_replaced_by_dispatch(tmpdir: Path) -> None:
+    path = tmpdir / "example.txt"
+    with path.open("w") as file:
+        file.write("<file content>")
+
+    async def endpoint_with_zerocopy(_: Request) -> FileResponse:
+        return FileResponse(path, zero_copy=True)
+
+    async def replace_response(request: Request, call_next: RequestResponseEndpoint) -> Response:
+        await call_next(request)
+        return PlainTextResponse("replaced")
+
+    app = Starlette(
+        middleware=[Middleware(BaseHTTPMiddleware, dispatch=replace_response)],
+        routes=[Route("/", endpoint_with_zerocopy)],
+    )
+
+    scope = {
+        "type": "http",
+        "version": "3",
+        "method": "GET",
+        "path": "/",
+        "headers": [],
+        "extensions": {"http.response.zerocopy": {}},
+    }
+    events: list[Message] = []
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        events.append(message)
+
+    await app(scope, receive, send)
+    assert events[1]["body"] == b"replaced"
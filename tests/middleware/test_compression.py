@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import zlib
+
+import pytest
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.compression import CompressionMiddleware, codecs, register_codec
+from starlette.middleware.gzip import CompressedResponseCache
+from starlette.requests import Request
+from starlette.responses import ContentStream, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from tests.types import TestClientFactory
+
+
+def homepage(request: Request) -> PlainTextResponse:
+    return PlainTextResponse("x" * 4000, status_code=200)
+
+
+def test_compression_negotiates_encoding(test_client_factory: TestClientFactory) -> None:
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage)],
+        middleware=[Middleware(CompressionMiddleware, encodings=["gzip", "deflate"])],
+    )
+    client = test_client_factory(app)
+
+    for accept_encoding, content_encoding in [
+        ("gzip", "gzip"),
+        ("deflate", "deflate"),
+        ("gzip, deflate", "gzip"),
+        ("gzip;q=0.5, deflate", "deflate"),
+        ("*", "gzip"),
+        ("*;q=0.5, gzip;q=0.1", "deflate"),
+    ]:
+        response = client.get("/", headers={"accept-encoding": accept_encoding})
+        assert response.status_code == 200
+        assert response.text == "x" * 4000
+        assert response.headers["Content-Encoding"] == content_encoding
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert int(response.headers["Content-Length"]) < 4000
+
+
+@pytest.mark.parametrize("accept_encoding", ["identity", "br", "gzip;q=0, deflate;q=0", ""])
+def test_compression_not_acceptable(accept_encoding: str, test_client_factory: TestClientFactory) -> None:
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage)],
+        middleware=[Middleware(CompressionMiddleware, encodings=["gzip", "deflate"])],
+    )
+    client = test_client_factory(app)
+
+    response = client.get("/", headers={"accept-encoding": accept_encoding})
+    assert response.status_code == 200
+    assert response.text == "x" * 4000
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert int(response.headers["Content-Length"]) == 4000
+
+
+def test_compression_levels(test_client_factory: TestClientFactory) -> None:
+    content = "".join(str(i) for i in range(2000))
+
+    def homepage(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(content, status_code=200)
+
+    for level in (1, 9):
+        app = Starlette(
+            routes=[Route("/", endpoint=homepage)],
+            middleware=[Middleware(CompressionMiddleware, levels={"gzip": level})],
+        )
+        client = test_client_factory(app)
+        response = client.get("/", headers={"accept-encoding": "gzip"})
+        assert response.text == content
+        compressobj = zlib.compressobj(level, zlib.DEFLATED, 31)
+        expected = compressobj.compress(content.encode()) + compressobj.flush()
+        assert int(response.headers["Content-Length"]) == len(expected)
+
+
+def test_compression_streaming_response(test_client_factory: TestClientFactory) -> None:
+    def homepage(request: Request) -> StreamingResponse:
+        async def generator() -> ContentStream:
+            # An empty first chunk still makes the response compressed.
+            yield b""
+            for _ in range(10):
+                yield b"x" * 400
+
+        return StreamingResponse(generator(), status_code=200)
+
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage)],
+        middleware=[Middleware(CompressionMiddleware)],
+    )
+    client = test_client_factory(app)
+
+    for content_encoding in ("gzip", "deflate"):
+        response = client.get("/", headers={"accept-encoding": content_encoding})
+        assert response.status_code == 200
+        assert response.text == "x" * 4000
+        assert response.headers["Content-Encoding"] == content_encoding
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert "Content-Length" not in response.headers
+
+
+def test_compression_cache_keyed_by_encoding(test_client_factory: TestClientFactory) -> None:
+    cache = CompressedResponseCache()
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage)],
+        middleware=[Middleware(CompressionMiddleware, encodings=["gzip", "deflate"], cache=cache)],
+    )
+    client = test_client_factory(app)
+
+    for content_encoding in ("gzip", "deflate", "gzip", "deflate"):
+        response = client.get("/", headers={"accept-encoding": content_encoding})
+        assert response.text == "x" * 4000
+        assert response.headers["Content-Encoding"] == content_encoding
+    assert (cache.hits, cache.misses, len(cache)) == (2, 2, 2)
+
+
+def test_compression_ignored_for_small_responses(test_client_factory: TestClientFactory) -> None:
+    def homepage(request: Request) -> PlainTextResponse:
+        return PlainTextResponse("OK", status_code=200)
+
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage)],
+        middleware=[Middleware(CompressionMiddleware)],
+    )
+    client = test_client_factory(app)
+
+    response = client.get("/", headers={"accept-encoding": "gzip"})
+    assert response.text == "OK"
+    assert "Content-Encoding" not in response.headers
+    assert "Vary" not in response.headers
+
+
+def test_compression_register_codec(test_client_factory: TestClientFactory, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("starlette.middleware.compression.codecs", dict(codecs))
+
+    class RawDeflateCompressor:
+        def __init__(self, level: int) -> None:
+            self.compressobj = zlib.compressobj(level, zlib.DEFLATED, -15)
+
+        def compress(self, data: bytes) -> bytes:
+            return self.compressobj.compress(data)
+
+        def flush(self) -> bytes:
+            return self.compressobj.flush()
+
+    register_codec("x-raw-deflate", RawDeflateCompressor, 6)
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage)],
+        middleware=[Middleware(CompressionMiddleware)],
+    )
+    client = test_client_factory(app)
+
+    response = client.get("/", headers={"accept-encoding": "gzip;q=0.5, x-raw-deflate"})
+    assert response.headers["Content-Encoding"] == "x-raw-deflate"
+    assert zlib.decompress(response.content, -15) == b"x" * 4000
+
+    response = client.get("/", headers={"accept-encoding": "gzip, x-raw-deflate"})
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_compression_unsupported_encoding() -> None:
+    with pytest.raises(AssertionError, match="Unsupported content encoding 'compress'."):
+        CompressionMiddleware(homepage, encodings=["compress"])  # type: ignore[arg-type]
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import gzip
+import json
+import zlib
+from typing import Callable
+
+import pytest
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.decompression import RequestDecompressionMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.types import Message, Receive, Scope, Send
+from tests.types import TestClientFactory
+
+
+async def echo(request: Request) -> JSONResponse:
+    return JSONResponse(
+        {
+            "body": (await request.body()).decode(),
+            "content_encoding": request.headers.get("content-encoding"),
+            "content_length": request.headers.get("content-length"),
+        }
+    )
+
+
+app = Starlette(
+    routes=[Route("/", endpoint=echo, methods=["POST"])],
+    middleware=[Middleware(RequestDecompressionMiddleware, max_size=1000)],
+)
+
+
+@pytest.mark.parametrize(
+    "content_encoding, compress",
+    [
+        ("gzip", gzip.compress),
+        ("x-gzip", gzip.compress),
+        ("deflate", zlib.compress),
+        ("GZip", gzip.compress),
+    ],
+)
+def test_decompression(
+    content_encoding: str, compress: Callable[[bytes], bytes], test_client_factory: TestClientFactory
+) -> None:
+    client = test_client_factory(app)
+    content = compress(b"x" * 1000)
+    response = client.post("/", content=content, headers={"content-encoding": content_encoding})
+    assert response.status_code == 200
+    assert response.json() == {"body": "x" * 1000, "content_encoding": None, "content_length": None}
+
+
+def test_decompression_json_and_form(test_client_factory: TestClientFactory) -> None:
+    async def endpoint(request: Request) -> JSONResponse:
+        if request.headers.get("content-type") == "application/json":
+            return JSONResponse(await request.json())
+        return JSONResponse(dict(await request.form()))
+
+    app = Starlette(
+        routes=[Route("/", endpoint=endpoint, methods=["POST"])],
+        middleware=[Middleware(RequestDecompressionMiddleware)],
+    )
+    client = test_client_factory(app)
+
+    content = gzip.compress(json.dumps({"hello": "world"}).encode())
+    response = client.post(
+        "/", content=content, headers={"content-encoding": "gzip", "content-type": "application/json"}
+    )
+    assert response.json() == {"hello": "world"}
+
+    content = gzip.compress(b"hello=world&foo=bar")
+    response = client.post(
+        "/",
+        content=content,
+        headers={"content-encoding": "gzip", "content-type": "application/x-www-form-urlencoded"},
+    )
+    assert response.json() == {"hello": "world", "foo": "bar"}
+
+
+@pytest.mark.parametrize("content_encoding", [None, "identity", "br"])
+def test_decompression_ignored(content_encoding: str | None, test_client_factory: TestClientFactory) -> None:
+    client = test_client_factory(app)
+    headers = {} if content_encoding is None else {"content-encoding": content_encoding}
+    response = client.post("/", content=b"hello", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"body": "hello", "content_encoding": content_encoding, "content_length": "5"}
+
+
+def test_decompression_too_large(test_client_factory: TestClientFactory) -> None:
+    client = test_client_factory(app)
+    content = gzip.compress(b"x" * 1001)
+    response = client.post("/", content=content, headers={"content-encoding": "gzip"})
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"not gzip at all",
+        gzip.compress(b"x" * 100)[:-10],
+        gzip.compress(b"x" * 100) + b"trailing data",
+    ],
+    ids=["invalid", "truncated", "trailing-data"],
+)
+def test_decompression_invalid(content: bytes, test_client_factory: TestClientFactory) -> None:
+    client = test_client_factory(app)
+    response = client.post("/", content=content, headers={"content-encoding": "gzip"})
+    assert response.status_code == 400
+    assert response.text == "Invalid compressed request body."
+
+
+@pytest.mark.anyio
+async def test_decompression_is_incremental() -> None:
+    content = gzip.compress(b"".join(str(i).encode() for i in range(1000)))
+    chunks = [content[:10], content[10:500], content[500:]]
+    messages: list[Message] = []
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+
+    async def receive() -> Message:
+        if chunks:
+            return {"type": "http.request", "body": chunks.pop(0), "more_body": bool(chunks)}
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        raise NotImplementedError()  # pragma: no cover
+
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": [(b"content-encoding", b"gzip")]}
+    await RequestDecompressionMiddleware(app, chunk_size=1000)(scope, receive, send)
+
+    assert messages[-1] == {"type": "http.disconnect"}
+    bodies = [message["body"] for message in messages[:-1]]
+    assert b"".join(bodies) == b"".join(str(i).encode() for i in range(1000))
+    assert all(len(body) <= 1000 for body in bodies)
+    assert len(bodies) > 3
+    assert [message["more_body"] for message in messages[:-1]] == [True] * (len(bodies) - 1) + [False]
@@ -1,16 +1,24 @@
 from __future__ import annotations
 
+import threading
+import zlib
 from pathlib import Path
 
 import pytest
 
 from starlette.applications import Starlette
 from starlette.middleware import Middleware
-from starlette.middleware.gzip import GZipMiddleware
+from starlette.middleware.gzip import (
+    AdaptiveCompressionLevel,
+    CompressedResponseCache,
+    GZipMiddleware,
+    GZipResponder,
+    OffloadLimiter,
+)
 from starlette.requests import Request
 from starlette.responses import ContentStream, FileResponse, PlainTextResponse, StreamingResponse
 from starlette.routing import Route
-from starlette.types import Message
+from starlette.types import Message, Receive, Scope, Send
 from tests.types import TestClientFactory
 
 
@@ -93,6 +101,28 @@ def test_gzip_streaming_response(test_client_factory: TestClientFactory) -> None
     assert "Content-Length" not in response.headers
 
 
+def test_gzip_streaming_response_with_empty_first_chunk(test_client_factory: TestClientFactory) -> None:
+    def homepage(request: Request) -> StreamingResponse:
+        async def generator() -> ContentStream:
+            yield b""
+            for _ in range(10):
+                yield b"x" * 400
+
+        return StreamingResponse(generator(), status_code=200)
+
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage)],
+        middleware=[Middleware(GZipMiddleware)],
+    )
+
+    client = test_client_factory(app)
+    response = client.get("/", headers={"accept-encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.text == "x" * 4000
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+
+
 def test_gzip_streaming_response_identity(test_client_factory: TestClientFactory) -> None:
     def homepage(request: Request) -> StreamingResponse:
         async def generator(bytes: bytes, count: int) -> ContentStream:
@@ -200,3 +230,315 @@ async def test_gzip_ignored_for_pathsend_responses(tmpdir: Path) -> None:
     assert len(events) == 2
     assert events[0]["type"] == "http.response.start"
     assert events[1]["type"] == "http.response.pathsend"
+
+
+@pytest.mark.anyio
+async def test_gzip_zerocopy_responses(tmpdir: Path) -> None:
+    path = tmpdir / "example.txt"
+    content = b"<file content>" * 10000
+    with path.open("wb") as file:
+        file.write(content)
+
+    events: list[Message] = []
+    file_contents: list[bytes] = []
+
+    app = GZipMiddleware(FileResponse(path, zero_copy=True), minimum_size=1)
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        events.append(message)
+        if message["type"] == "http.response.zerocopy":
+            file = message["file"]
+            file.seek(message["offset"])
+            file_contents.append(file.read(message.get("count", -1)))
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", b"gzip")],
+        "extensions": {"http.response.zerocopy": {}},
+    }
+    await app(scope, receive, send)
+
+    assert [event["type"] for event in events] == ["http.response.start", "http.response.zerocopy"]
+    assert (b"content-encoding", b"gzip") not in events[0]["headers"]
+    assert file_contents == [content]
+
+    # A multipart body is already being compressed when the ranges arrive, so they're read.
+    events.clear()
+    scope["headers"] = [(b"accept-encoding", b"gzip"), (b"range", b"bytes=0-9,20-29")]
+    await app(scope, receive, send)
+
+    assert {event["type"] for event in events} == {"http.response.start", "http.response.body"}
+    assert (b"content-encoding", b"gzip") in events[0]["headers"]
+    assert events[-1]["more_body"] is False
+    body = zlib.decompress(b"".join(event["body"] for event in events[1:]), wbits=31)
+    assert content[:10] in body
+    assert content[20:30] in body
+    assert body.endswith(b"--\n")
+
+    # Without a count, the rest of the file is read.
+    headers: list[tuple[bytes, bytes]] = []
+
+    async def send_rest_of_file(scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b"x" * 10, "more_body": True})
+        with open(path, "rb") as file:
+            await send({"type": "http.response.zerocopy", "file": file, "offset": 10})
+
+    events.clear()
+    scope["headers"] = [(b"accept-encoding", b"gzip")]
+    await GZipMiddleware(send_rest_of_file, minimum_size=1)(scope, receive, send)
+    body = zlib.decompress(b"".join(event["body"] for event in events[1:]), wbits=31)
+    assert body == b"x" * 10 + content[10:]
+
+    # Responses that aren't compressed pass the ranges through.
+    events.clear()
+    file_contents.clear()
+    headers.append((b"content-type", b"text/event-stream"))
+    await GZipMiddleware(send_rest_of_file, minimum_size=1)(scope, receive, send)
+    assert [event["type"] for event in events] == [
+        "http.response.start",
+        "http.response.body",
+        "http.response.zerocopy",
+    ]
+    assert file_contents == [content[10:]]
+
+
+def test_gzip_offloads_large_chunks(test_client_factory: TestClientFactory, monkeypatch: pytest.MonkeyPatch) -> None:
+    threads: list[threading.Thread] = []
+    apply_compression = GZipResponder.apply_compression
+
+    def record_thread(self: GZipResponder, body: bytes, *, more_body: bool) -> bytes:
+        threads.append(threading.current_thread())
+        return apply_compression(self, body, more_body=more_body)
+
+    monkeypatch.setattr("starlette.middleware.gzip.GZipResponder.apply_compression", record_thread)
+
+    def homepage(request: Request) -> StreamingResponse:
+        async def generator() -> ContentStream:
+            yield b"x" * 4000
+            yield b"x" * 400
+            yield b"x" * 4000
+
+        return StreamingResponse(generator(), status_code=200)
+
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage)],
+        middleware=[Middleware(GZipMiddleware, offload_size=1000, offload_limit=1)],
+    )
+    with test_client_factory(app) as client:
+        for _ in range(2):
+            threads.clear()
+            response = client.get("/", headers={"accept-encoding": "gzip"})
+            assert response.status_code == 200
+            assert response.text == "x" * 8400
+            assert response.headers["Content-Encoding"] == "gzip"
+            # The 400 byte chunk and the final empty one are compressed on the event loop.
+            assert len(threads) == 4
+            assert [thread is threads[1] for thread in threads] == [False, True, False, True]
+
+
+def test_gzip_offload_disabled(test_client_factory: TestClientFactory, monkeypatch: pytest.MonkeyPatch) -> None:
+    threads: list[threading.Thread] = []
+    apply_compression = GZipResponder.apply_compression
+
+    def record_thread(self: GZipResponder, body: bytes, *, more_body: bool) -> bytes:
+        threads.append(threading.current_thread())
+        return apply_compression(self, body, more_body=more_body)
+
+    monkeypatch.setattr("starlette.middleware.gzip.GZipResponder.apply_compression", record_thread)
+
+    async def homepage(request: Request) -> PlainTextResponse:
+        threads.append(threading.current_thread())
+        return PlainTextResponse("x" * 4000, status_code=200)
+
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage)],
+        middleware=[Middleware(GZipMiddleware, offload_size=None)],
+    )
+    client = test_client_factory(app)
+    response = client.get("/", headers={"accept-encoding": "gzip"})
+    assert response.text == "x" * 4000
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(threads) == 2
+    assert threads[0] is threads[1]
+
+
+def test_gzip_compressed_response_cache(test_client_factory: TestClientFactory) -> None:
+    def homepage(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(request.query_params["char"] * 4000, status_code=200)
+
+    cache = CompressedResponseCache(maxsize=2)
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage)],
+        middleware=[Middleware(GZipMiddleware, cache=cache)],
+    )
+    client = test_client_factory(app)
+
+    for char, (hits, misses, evictions) in [
+        ("a", (0, 1, 0)),
+        ("a", (1, 1, 0)),
+        ("b", (1, 2, 0)),
+        ("c", (1, 3, 1)),
+        ("b", (2, 3, 1)),
+        ("a", (2, 4, 2)),
+    ]:
+        response = client.get("/", params={"char": char}, headers={"accept-encoding": "gzip"})
+        assert response.text == char * 4000
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert (cache.hits, cache.misses, cache.evictions) == (hits, misses, evictions)
+    assert len(cache) == 2
+
+
+def test_gzip_compressed_response_cache_skips_compression(
+    test_client_factory: TestClientFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls: list[bytes] = []
+    apply_compression = GZipResponder.apply_compression
+
+    def record_call(self: GZipResponder, body: bytes, *, more_body: bool) -> bytes:
+        calls.append(body)
+        return apply_compression(self, body, more_body=more_body)
+
+    monkeypatch.setattr("starlette.middleware.gzip.GZipResponder.apply_compression", record_call)
+
+    def homepage(request: Request) -> PlainTextResponse:
+        return PlainTextResponse("x" * 4000, status_code=200)
+
+    def streaming(request: Request) -> StreamingResponse:
+        async def generator() -> ContentStream:
+            yield b"x" * 4000
+
+        return StreamingResponse(generator(), status_code=200)
+
+    cache = CompressedResponseCache(max_body_size=1000)
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage), Route("/streaming", endpoint=streaming)],
+        middleware=[Middleware(GZipMiddleware, cache=cache)],
+    )
+    client = test_client_factory(app)
+
+    # Bodies larger than `max_body_size`, and streaming responses, are not cached.
+    for path in ("/", "/", "/streaming", "/streaming"):
+        response = client.get(path, headers={"accept-encoding": "gzip"})
+        assert response.text == "x" * 4000
+        assert response.headers["Content-Encoding"] == "gzip"
+    assert len(calls) == 6
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+    cache.max_body_size = 4000
+    calls.clear()
+    for _ in range(3):
+        response = client.get("/", headers={"accept-encoding": "gzip"})
+        assert response.text == "x" * 4000
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses, len(cache)) == (2, 1, 1)
+
+
+def test_adaptive_compression_level(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 0.0
+    monkeypatch.setattr("starlette.middleware.gzip.time.monotonic", lambda: now)
+    adaptive = AdaptiveCompressionLevel(max_level=9, min_level=6, interval=1.0)
+    assert adaptive.level() == 9
+
+    # Nothing changes until the interval has elapsed.
+    adaptive.record(0.9)
+    now = 0.5
+    assert adaptive.level() == 9
+
+    levels = []
+    for _ in range(5):
+        adaptive.record(0.5)
+        now += 1.0
+        levels.append(adaptive.level())
+    assert levels == [8, 7, 6, 0, 0]
+    assert adaptive.load == 0.5
+
+    # A moderate load keeps the current level.
+    adaptive.current_level = 7
+    adaptive.record(0.1)
+    now += 1.0
+    assert adaptive.level() == 7
+
+    adaptive.current_level = 0
+    levels = []
+    for _ in range(5):
+        now += 1.0
+        levels.append(adaptive.level())
+    assert levels == [6, 7, 8, 9, 9]
+    assert adaptive.load == 0.0
+
+
+def test_adaptive_compression_level_invalid() -> None:
+    with pytest.raises(AssertionError, match="Compression levels must be such that"):
+        AdaptiveCompressionLevel(max_level=10)
+    with pytest.raises(AssertionError, match="Compression levels must be such that"):
+        AdaptiveCompressionLevel(max_level=4, min_level=5)
+
+
+def test_gzip_adaptive_compression_level(test_client_factory: TestClientFactory) -> None:
+    content = "".join(str(i) for i in range(2000))
+
+    def homepage(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(content, status_code=200)
+
+    adaptive = AdaptiveCompressionLevel(interval=3600)
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage)],
+        middleware=[Middleware(GZipMiddleware, compresslevel=adaptive)],
+    )
+    client = test_client_factory(app)
+
+    for level in (9, 1):
+        adaptive.current_level = level
+        response = client.get("/", headers={"accept-encoding": "gzip"})
+        assert response.text == content
+        assert response.headers["Content-Encoding"] == "gzip"
+        compressobj = zlib.compressobj(level, zlib.DEFLATED, 31)
+        expected = compressobj.compress(content.encode()) + compressobj.flush()
+        assert int(response.headers["Content-Length"]) == len(expected)
+    assert adaptive.busy > 0
+
+    # A level of 0 skips compression.
+    adaptive.current_level = 0
+    response = client.get("/", headers={"accept-encoding": "gzip"})
+    assert response.text == content
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+
+
+def test_gzip_adaptive_compression_level_ignores_offloaded_chunks(test_client_factory: TestClientFactory) -> None:
+    content = "".join(str(i) for i in range(2000))
+
+    def homepage(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(content, status_code=200)
+
+    adaptive = AdaptiveCompressionLevel(interval=3600)
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage)],
+        middleware=[Middleware(GZipMiddleware, compresslevel=adaptive, offload_size=1000)],
+    )
+    client = test_client_factory(app)
+
+    response = client.get("/", headers={"accept-encoding": "gzip"})
+    assert response.text == content
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert adaptive.busy == 0.0
+
+
+@pytest.mark.anyio
+async def test_offload_limiters_are_not_shared() -> None:
+    first, second = OffloadLimiter(1), OffloadLimiter(16)
+    assert first.get() is first.get()
+    assert first.get() is not second.get()
+    assert (first.get().total_tokens, second.get().total_tokens) == (1, 16)
+
+    app = PlainTextResponse("x")
+    gzip_one = GZipMiddleware(app, offload_limit=1)
+    gzip_two = GZipMiddleware(app, offload_limit=2)
+    assert gzip_one.offload_limiter.get().total_tokens == 1
+    assert gzip_two.offload_limiter.get().total_tokens == 2
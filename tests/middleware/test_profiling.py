@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import math
+
+import anyio
+import pytest
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import InlineHTTPMiddleware, RequestResponseEndpoint
+from starlette.middleware.profiling import Histogram, MiddlewareProfiler
+from starlette.requests import Request
+from starlette.responses import ContentStream, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from starlette.websockets import WebSocket
+from tests.types import TestClientFactory
+
+
+def test_histogram() -> None:
+    histogram = Histogram(buckets=(0.001, 0.01, 0.1))
+    assert histogram.mean == 0.0
+    assert histogram.quantile(0.5) == 0.0
+
+    for value in (0.0005, 0.001, 0.005, 0.005, 0.05, 1.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 2, 1, 1]
+    assert histogram.count == 6
+    assert histogram.mean == pytest.approx(1.0615 / 6)
+    assert histogram.quantile(0.0) == 0.001
+    assert histogram.quantile(0.5) == 0.01
+    assert histogram.quantile(0.8) == 0.1
+    assert histogram.quantile(1.0) == math.inf
+
+
+class SlowBeforeMiddleware(InlineHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        await anyio.sleep(0.02)
+        return await call_next(request)
+
+
+class SlowSendMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async def slow_send(message: Message) -> None:
+            if message["type"] == "http.response.body":
+                await anyio.sleep(0.02)
+            await send(message)
+
+        await self.app(scope, receive, slow_send)
+        if scope["type"] == "http":
+            await anyio.sleep(0.02)
+
+
+async def homepage(request: Request) -> StreamingResponse:
+    async def generator() -> ContentStream:
+        yield b"Hello, "
+        yield b"world!"
+
+    await request.body()
+    return StreamingResponse(generator())
+
+
+async def websocket_endpoint(session: WebSocket) -> None:
+    await session.accept()
+    await session.send_text("Hello, world!")
+    await session.close()
+
+
+def test_middleware_profiler(test_client_factory: TestClientFactory) -> None:
+    app = Starlette(
+        routes=[Route("/", endpoint=homepage, methods=["POST"]), WebSocketRoute("/ws", endpoint=websocket_endpoint)],
+        middleware=[Middleware(SlowSendMiddleware), Middleware(SlowBeforeMiddleware), Middleware(SlowBeforeMiddleware)],
+    )
+    profiler = app.middleware_profiler = MiddlewareProfiler()
+
+    with test_client_factory(app) as client:
+        for _ in range(2):
+            response = client.post("/", content=b"data")
+            assert response.text == "Hello, world!"
+        with client.websocket_connect("/ws") as session:
+            assert session.receive_text() == "Hello, world!"
+
+    assert list(profiler.layers) == [
+        "Router",
+        "ExceptionMiddleware",
+        "SlowBeforeMiddleware",
+        "SlowBeforeMiddleware#2",
+        "SlowSendMiddleware",
+        "ServerErrorMiddleware",
+    ]
+    for stats in profiler.layers.values():
+        assert stats.inclusive["total"].count == 2
+        assert stats.exclusive["total"].count == 2
+        for histograms in (stats.inclusive, stats.exclusive):
+            assert histograms["total"].total == pytest.approx(
+                sum(histograms[phase].total for phase in ("before", "body", "after"))
+            )
+
+    # Time spent in a layer's own code is charged to that layer only.
+    for name in ("SlowBeforeMiddleware", "SlowBeforeMiddleware#2"):
+        assert profiler.layers[name].exclusive["before"].mean >= 0.02
+    # Layers are named from the innermost one, so "#2" runs outside the first one.
+    assert profiler.layers["SlowBeforeMiddleware#2"].inclusive["before"].mean >= 0.04
+    assert profiler.layers["ExceptionMiddleware"].exclusive["before"].mean < 0.02
+
+    # `SlowSendMiddleware` sleeps in its `send`, which the inner layers call, and after the response.
+    slow_send = profiler.layers["SlowSendMiddleware"]
+    assert slow_send.exclusive["before"].mean < 0.02
+    assert slow_send.exclusive["body"].mean >= 0.02
+    assert slow_send.exclusive["after"].mean >= 0.02
+    assert profiler.layers["SlowBeforeMiddleware#2"].exclusive["body"].mean < 0.02
+    assert profiler.layers["ServerErrorMiddleware"].inclusive["after"].mean >= 0.02
+
+    lines = profiler.report().splitlines()
+    assert lines[0].split() == [
+        "Layer",
+        "Requests",
+        "Inclusive",
+        "Exclusive",
+        "Excl.",
+        "p99",
+        "Before",
+        "Body",
+        "After",
+    ]
+    assert lines[1].split()[:2] == ["SlowSendMiddleware", "2"]
+    assert len(lines) == 7
+
+    profiler.reset()
+    assert all(stats.inclusive["total"].count == 0 for stats in profiler.layers.values())
+
+
+def test_middleware_profiler_exception(test_client_factory: TestClientFactory) -> None:
+    def homepage(request: Request) -> PlainTextResponse:
+        raise RuntimeError("Oops")
+
+    app = Starlette(routes=[Route("/", endpoint=homepage)])
+    profiler = app.middleware_profiler = MiddlewareProfiler()
+
+    client = test_client_factory(app, raise_server_exceptions=False)
+    response = client.get("/")
+    assert response.status_code == 500
+
+    # The router raised before starting a response, so all its time is spent before it.
+    router = profiler.layers["Router"]
+    assert router.inclusive["total"].count == 1
+    assert router.inclusive["body"].total == router.inclusive["after"].total == 0.0
+    # `ServerErrorMiddleware` sends the error response, and re-raises the exception afterwards.
+    server_error = profiler.layers["ServerErrorMiddleware"]
+    assert server_error.inclusive["total"].count == 1
+    assert server_error.inclusive["body"].total > 0
+
+
+@pytest.mark.anyio
+async def test_middleware_profiler_zerocopy_ends_body() -> None:
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        with open(__file__, "rb") as file:
+            await send({"type": "http.response.zerocopy", "file": file, "offset": 0, "count": 10, "more_body": True})
+            await send({"type": "http.response.zerocopy", "file": file, "offset": 10, "count": 10})
+        await anyio.sleep(0.02)
+
+    async def receive() -> Message:
+        raise NotImplementedError()  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        pass
+
+    profiler = MiddlewareProfiler()
+    await profiler.wrap("App", app)({"type": "http"}, receive, send)
+
+    assert profiler.layers["App"].inclusive["after"].mean >= 0.02
+    assert profiler.layers["App"].inclusive["body"].mean < 0.02
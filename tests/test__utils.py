@@ -4,7 +4,7 @@ from unittest.mock import create_autospec
 
 import pytest
 
-from starlette._utils import get_route_path, is_async_callable
+from starlette._utils import get_route_path, is_async_callable, negotiate_encodings, parse_accept_encoding
 from starlette.types import Scope
 
 
@@ -102,3 +102,26 @@ def test_async_mocked_async_function() -> None:
 )
 def test_get_route_path(scope: Scope, expected_result: str) -> None:
     assert get_route_path(scope) == expected_result
+
+
+def test_parse_accept_encoding() -> None:
+    assert parse_accept_encoding("gzip, deflate, br, zstd") == {"gzip": 1.0, "deflate": 1.0, "br": 1.0, "zstd": 1.0}
+    assert parse_accept_encoding("GZIP;q=0.5 , br ; Q=0.8, ,*;q=0") == {"gzip": 0.5, "br": 0.8, "*": 0.0}
+    assert parse_accept_encoding("gzip;level=1;q=0.2, br;q=invalid") == {"gzip": 0.2, "br": 0.0}
+    assert parse_accept_encoding("") == {}
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected_result",
+    [
+        ("gzip, deflate, br, zstd", ("br", "zstd", "gzip")),
+        ("gzip;q=1, br;q=0.5", ("gzip", "br")),
+        ("gzip, br;q=0", ("gzip",)),
+        ("*", ("br", "zstd", "gzip")),
+        ("*;q=0.1, zstd", ("zstd", "br", "gzip")),
+        ("identity", ()),
+        ("", ()),
+    ],
+)
+def test_negotiate_encodings(accept_encoding: str, expected_result: tuple[str, ...]) -> None:
+    assert negotiate_encodings(accept_encoding, ("br", "zstd", "gzip")) == expected_result
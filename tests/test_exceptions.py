@@ -4,13 +4,15 @@ from typing import Any
 import pytest
 from pytest import MonkeyPatch
 
+from starlette._exception_handler import ExceptionHandlerTable, wrap_app_handling_exceptions
+from starlette.applications import Starlette
 from starlette.exceptions import HTTPException, WebSocketException
 from starlette.middleware.exceptions import ExceptionMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse, PlainTextResponse
-from starlette.routing import Route, Router, WebSocketRoute
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Mount, Route, Router, WebSocketRoute
 from starlette.testclient import TestClient
-from starlette.types import Receive, Scope, Send
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from tests.types import TestClientFactory
 
 
@@ -222,3 +224,148 @@ def test_handlers_annotations() -> None:
 
     ExceptionMiddleware(router, handlers={Exception: sync_catch_all_handler})
     ExceptionMiddleware(router, handlers={Exception: async_catch_all_handler})
+
+
+def test_exception_handler_table() -> None:
+    def http_handler(request: Request, exc: Exception) -> Response:
+        raise NotImplementedError()  # pragma: no cover
+
+    def bad_body_handler(request: Request, exc: Exception) -> Response:
+        raise NotImplementedError()  # pragma: no cover
+
+    table = ExceptionHandlerTable({HTTPException: http_handler})
+    assert table.lookup(BadBodyException) is http_handler
+    assert table.lookup(RuntimeError) is None
+    assert table.resolved == {BadBodyException: http_handler, RuntimeError: None}
+    assert table.lookup(BadBodyException) is http_handler
+
+    table[BadBodyException] = bad_body_handler
+    assert table.lookup(BadBodyException) is bad_body_handler
+    del table[BadBodyException]
+    assert table.lookup(BadBodyException) is http_handler
+    table.update({BadBodyException: bad_body_handler})
+    assert table.lookup(BadBodyException) is bad_body_handler
+    assert table.pop(BadBodyException) is bad_body_handler
+    assert table.lookup(BadBodyException) is http_handler
+    assert table.setdefault(BadBodyException, bad_body_handler) is bad_body_handler
+    assert table.lookup(BadBodyException) is bad_body_handler
+    assert table.popitem() == (BadBodyException, bad_body_handler)
+    assert table.lookup(BadBodyException) is http_handler
+    table |= {BadBodyException: bad_body_handler}
+    assert table.lookup(BadBodyException) is bad_body_handler
+    table.clear()
+    assert table.lookup(BadBodyException) is None
+
+
+def test_exception_handler_added_after_lookup(test_client_factory: TestClientFactory) -> None:
+    app = ExceptionMiddleware(router)
+    client = test_client_factory(app)
+    response = client.post("/consume_body_in_endpoint_and_handler", content=b"Hello!")
+    assert response.status_code == 422
+    assert response.headers["content-type"] == "text/plain; charset=utf-8"
+
+    app.add_exception_handler(BadBodyException, handler_that_reads_body)  # type: ignore[arg-type]
+    response = client.post("/consume_body_in_endpoint_and_handler", content=b"Hello!")
+    assert response.json() == {"body": "Hello!"}
+
+
+def test_wrap_app_handling_exceptions(test_client_factory: TestClientFactory) -> None:
+    def handler(request: Request, exc: Exception) -> Response:
+        return PlainTextResponse("Handled", status_code=400)
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+            raise BadBodyException(status_code=406)
+
+        if scope["path"] == "/handled":
+            scope["starlette.exception_handlers"] = ({HTTPException: handler}, {})
+        request = Request(scope, receive, send)
+        await wrap_app_handling_exceptions(endpoint, request)(scope, receive, send)
+
+    client = test_client_factory(app)
+    response = client.get("/handled")
+    assert response.status_code == 400
+    assert response.text == "Handled"
+
+    with pytest.raises(BadBodyException):
+        client.get("/unhandled")
+
+
+@pytest.mark.anyio
+async def test_default_http_exception_responses_are_cached() -> None:
+    middleware = ExceptionMiddleware(router)
+    request = Request({"type": "http"})
+
+    response = await middleware.http_exception(request, HTTPException(status_code=404))
+    assert response is await middleware.http_exception(request, HTTPException(status_code=404))
+    assert response.body == b"Not Found"
+    assert response is not await middleware.http_exception(request, HTTPException(status_code=403))
+
+    allow_get = await middleware.http_exception(request, HTTPException(405, headers={"Allow": "GET"}))
+    assert allow_get is await middleware.http_exception(request, HTTPException(405, headers={"allow": "GET"}))
+    assert allow_get.headers["allow"] == "GET"
+    allow_post = await middleware.http_exception(request, HTTPException(405, headers={"Allow": "POST"}))
+    assert allow_post is not allow_get
+    assert allow_post.headers["allow"] == "POST"
+
+    # Custom details and headers, and unknown status codes, are rendered every time.
+    for exc in [
+        HTTPException(status_code=404, detail="No such user"),
+        HTTPException(status_code=404, headers={"x-potato": "always"}),
+        HTTPException(status_code=405, headers={"Allow": "GET", "x-potato": "always"}),
+        HTTPException(status_code=499, detail="Client Closed Request"),
+    ]:
+        response = await middleware.http_exception(request, exc)
+        assert response is not await middleware.http_exception(request, exc)
+        assert response.body == exc.detail.encode()
+
+    # A custom detail doesn't evict the cached default response.
+    assert allow_get is await middleware.http_exception(request, HTTPException(405, headers={"Allow": "GET"}))
+
+
+def test_cached_http_exception_response_headers_are_copied(test_client_factory: TestClientFactory) -> None:
+    def add_header(app: ASGIApp) -> ASGIApp:
+        async def wrapped_app(scope: Scope, receive: Receive, send: Send) -> None:
+            async def send_with_header(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    message["headers"].append((b"x-added", b"yes"))
+                await send(message)
+
+            await app(scope, receive, send_with_header)
+
+        return wrapped_app
+
+    app = add_header(ExceptionMiddleware(add_header(router)))
+    client = test_client_factory(app)
+
+    for _ in range(3):
+        response = client.post("/not_acceptable")
+        assert response.status_code == 405
+        assert set(response.headers["allow"].split(", ")) == {"GET", "HEAD"}
+        assert response.headers.get_list("x-added") == ["yes", "yes"]
+
+        response = client.get("/not_acceptable")
+        assert response.status_code == 406
+        assert response.text == "Not Acceptable"
+        assert response.headers.get_list("x-added") == ["yes", "yes"]
+
+
+def test_nested_exception_middleware_keeps_outer_handlers(test_client_factory: TestClientFactory) -> None:
+    class Boom(Exception):
+        pass
+
+    def boom(request: Request) -> None:
+        raise Boom()
+
+    def handler(request: Request, exc: Exception) -> Response:
+        return PlainTextResponse("Handled", status_code=418)
+
+    app = Starlette(
+        routes=[Mount("/sub", app=ExceptionMiddleware(Router([Route("/", endpoint=boom)])))],
+        exception_handlers={Boom: handler},
+    )
+
+    client = test_client_factory(app)
+    response = client.get("/sub/")
+    assert response.status_code == 418
+    assert response.text == "Handled"
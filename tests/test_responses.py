@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import datetime as dt
+import hashlib
+import os
 import sys
 import time
+from collections import OrderedDict
 from collections.abc import AsyncGenerator, AsyncIterator, Iterator
 from http.cookies import SimpleCookie
 from pathlib import Path
@@ -15,9 +18,24 @@ from starlette import status
 from starlette.background import BackgroundTask
 from starlette.datastructures import Headers
 from starlette.requests import ClientDisconnect, Request
-from starlette.responses import FileResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
-from starlette.testclient import TestClient
+from starlette.responses import (
+    FLUSH,
+    EventSourceResponse,
+    FileResponse,
+    JSONResponse,
+    PrecomputedResponse,
+    RedirectResponse,
+    Response,
+    ServerSentEvent,
+    StreamingResponse,
+    _EventStream,
+    _get_heartbeat,
+    _header_template,
+    _stat_validators,
+)
+from starlette.testclient import TestClient, WebSocketDenialResponse
 from starlette.types import Message, Receive, Scope, Send
+from starlette.websockets import WebSocket
 from tests.types import TestClientFactory
 
 
@@ -512,6 +530,114 @@ def test_populate_headers(test_client_factory: TestClientFactory) -> None:
     assert response.headers["content-type"] == "text/html; charset=utf-8"
 
 
+def test_header_template_is_not_shared_between_responses() -> None:
+    first = Response(content="hi", headers={"X-Custom": "1"}, media_type="text/plain")
+    second = Response(content="hello", headers={"X-Custom": "1"}, media_type="text/plain")
+    first.headers["x-other"] = "2"
+
+    assert second.raw_headers == [
+        (b"x-custom", b"1"),
+        (b"content-length", b"5"),
+        (b"content-type", b"text/plain; charset=utf-8"),
+    ]
+    assert "x-other" not in Response(content="hi", headers={"X-Custom": "1"}, media_type="text/plain").headers
+
+
+def test_header_template_is_keyed_on_header_names() -> None:
+    _header_template.cache_clear()
+    for token in ("first-secret", "second-secret"):
+        response = Response(content="hi", headers={"X-Token": token}, media_type="text/plain")
+        assert response.headers["x-token"] == token
+    assert _header_template.cache_info().currsize == 1
+    assert _header_template.cache_info().hits == 1
+
+
+def test_header_template_respects_explicit_content_headers() -> None:
+    response = Response(
+        content="hi",
+        headers={"Content-Type": "text/csv", "Content-Length": "10"},
+        media_type="text/plain",
+    )
+    assert response.raw_headers == [(b"content-type", b"text/csv"), (b"content-length", b"10")]
+
+
+def test_precomputed_response(test_client_factory: TestClientFactory) -> None:
+    app = PrecomputedResponse("hello, world", media_type="text/plain")
+    client = test_client_factory(app)
+
+    for _ in range(2):
+        response = client.get("/")
+        assert response.text == "hello, world"
+        assert response.headers["content-length"] == "12"
+        assert response.headers["content-type"] == "text/plain; charset=utf-8"
+
+    response = client.head("/")
+    assert response.text == ""
+    assert response.headers["content-length"] == "12"
+
+
+def test_precomputed_response_sends_fresh_messages() -> None:
+    response = PrecomputedResponse(b"xxxxx")
+    scope: Scope = {"type": "http", "method": "GET"}
+    messages: list[Message] = []
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+        if message["type"] == "http.response.start":
+            message["headers"].append((b"content-encoding", b"gzip"))
+        else:
+            message["body"] = b"compressed"
+
+    async def run() -> None:
+        await response(scope, receive, send)
+        await response(scope, receive, send)
+
+    anyio.run(run)
+    assert response.body == b"xxxxx"
+    assert response.raw_headers == [(b"content-length", b"5")]
+    assert messages[0] is not messages[2]
+
+
+def test_response_freeze(test_client_factory: TestClientFactory) -> None:
+    original = JSONResponse({"hello": "world"}, status_code=201, headers={"cache-control": "max-age=60"})
+    app = original.freeze()
+    original.headers["x-changed"] = "after-freeze"
+
+    client = test_client_factory(app)
+    response = client.get("/")
+    assert isinstance(app, PrecomputedResponse)
+    assert response.status_code == 201
+    assert response.json() == {"hello": "world"}
+    assert response.headers["cache-control"] == "max-age=60"
+    assert response.headers["content-type"] == "application/json"
+    assert "x-changed" not in response.headers
+
+
+def test_response_freeze_with_background_task() -> None:
+    response = Response("hi", background=BackgroundTask(lambda: None))
+    with pytest.raises(AssertionError, match="Responses with background tasks cannot be frozen."):
+        response.freeze()
+
+
+def test_precomputed_websocket_denial_response(test_client_factory: TestClientFactory) -> None:
+    denial = PrecomputedResponse("forbidden", status_code=403)
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        websocket = WebSocket(scope, receive=receive, send=send)
+        await websocket.receive()
+        await websocket.send_denial_response(denial)
+
+    client = test_client_factory(app)
+    with pytest.raises(WebSocketDenialResponse) as exc:
+        with client.websocket_connect("/"):
+            pass  # pragma: no cover
+    assert exc.value.status_code == 403
+    assert exc.value.content == b"forbidden"
+
+
 def test_head_method(test_client_factory: TestClientFactory) -> None:
     app = Response("hello, world", media_type="text/plain")
     client = test_client_factory(app)
@@ -656,6 +782,137 @@ async def test_streaming_response_on_client_disconnects() -> None:
     await stream.aclose()
 
 
+@pytest.mark.anyio
+async def test_streaming_response_without_disconnect_listener() -> None:
+    chunks = bytearray()
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.body":
+            if chunks:
+                raise OSError
+            chunks.extend(message["body"])
+
+    async def stream_indefinitely() -> AsyncGenerator[bytes, None]:
+        while True:
+            await anyio.sleep(0)
+            yield b"chunk"
+
+    stream = stream_indefinitely()
+    response = StreamingResponse(content=stream, disconnect_listener=False)
+
+    with anyio.move_on_after(1) as cancel_scope:
+        with pytest.raises(ClientDisconnect):
+            await response({"asgi": {"spec_version": "2.3"}}, receive, send)
+    assert not cancel_scope.cancel_called, "Content streaming should stop itself."
+    assert chunks == b"chunk"
+    await stream.aclose()
+
+
+@pytest.mark.anyio
+async def test_streaming_response_without_disconnect_listener_misses_disconnect() -> None:
+    bodies: list[bytes] = []
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.body":
+            bodies.append(message["body"])
+
+    # The client is gone, but nothing watches `receive()`, so all the content is produced.
+    response = StreamingResponse(content=iter([b"a", b"b", b"c"]), disconnect_listener=False)
+    await response({"asgi": {"spec_version": "2.3"}}, receive, send)
+    assert bodies == [b"a", b"b", b"c", b""]
+
+
+async def collect_body_messages(response: StreamingResponse) -> list[bytes]:
+    bodies: list[bytes] = []
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.body":
+            bodies.append(bytes(message["body"]))
+
+    await response({"asgi": {"spec_version": "2.4"}}, receive, send)
+    return bodies
+
+
+@pytest.mark.anyio
+async def test_streaming_response_buffer_size() -> None:
+    response = StreamingResponse(["first", *(f"{i}," for i in range(10))], buffer_size=8)
+    bodies = await collect_body_messages(response)
+    assert bodies == [b"first", b"0,1,2,3,", b"4,5,6,7,", b"8,9,"]
+
+
+@pytest.mark.anyio
+async def test_streaming_response_buffer_flush_marker() -> None:
+    response = StreamingResponse(["a", "b", "c", FLUSH, FLUSH, "d", memoryview(b"e")], buffer_size=1024)
+    bodies = await collect_body_messages(response)
+    assert bodies == [b"a", b"bc", b"de"]
+
+
+@pytest.mark.anyio
+async def test_streaming_response_buffer_single_chunk() -> None:
+    response = StreamingResponse(["a", "b"], buffer_size=1024)
+    bodies = await collect_body_messages(response)
+    assert bodies == [b"a", b"b"]
+
+
+@pytest.mark.anyio
+async def test_streaming_response_buffer_flush_interval() -> None:
+    bodies: list[bytes] = []
+
+    async def stream() -> AsyncIterator[str]:
+        yield "a"
+        yield "b"
+        await anyio.sleep(0.05)
+        # The buffered chunk was sent without waiting for the next one.
+        assert bodies == [b"a", b"b"]
+        yield "c"
+        yield "d"
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.body":
+            bodies.append(bytes(message["body"]))
+
+    response = StreamingResponse(stream(), buffer_size=1024, flush_interval=0.01)
+    await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+    assert bodies == [b"a", b"b", b"cd"]
+
+
+@pytest.mark.anyio
+async def test_streaming_response_buffer_flush_interval_many_chunks() -> None:
+    async def stream() -> AsyncIterator[bytes]:
+        for _ in range(1000):
+            yield b"x"
+
+    response = StreamingResponse(stream(), buffer_size=100, flush_interval=1.0)
+    bodies = await collect_body_messages(response)
+    assert b"".join(bodies) == b"x" * 1000
+    assert bodies[0] == b"x"
+    assert all(len(body) == 100 for body in bodies[1:-1])
+
+
+@pytest.mark.anyio
+async def test_streaming_response_flush_marker_without_buffer() -> None:
+    response = StreamingResponse(["a", FLUSH, "b"])
+    bodies = await collect_body_messages(response)
+    assert bodies == [b"a", b"b", b""]
+
+
+def test_streaming_response_flush_interval_requires_buffer_size() -> None:
+    with pytest.raises(AssertionError, match="'flush_interval' requires 'buffer_size' to be set."):
+        StreamingResponse(["a"], flush_interval=1.0)
+
+
 README = """\
 # BáiZé
 
@@ -851,3 +1108,579 @@ async def test_file_response_multi_small_chunk_size(readme_file: Path) -> None:
         b"\n",
         f"\n--{boundary}--\n".encode(),
     ]
+
+
+@pytest.mark.anyio
+async def test_file_response_zero_copy_extension(readme_file: Path) -> None:
+    messages: list[Message] = []
+    file_contents: list[bytes] = []
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+        if message["type"] == "http.response.zerocopy":
+            file = message["file"]
+            file.seek(message["offset"])
+            file_contents.append(file.read(message["count"]))
+
+    scope: Scope = {"type": "http", "method": "GET", "extensions": {"http.response.zerocopy": {}}}
+
+    await FileResponse(readme_file, zero_copy=True)({**scope, "headers": []}, receive, send)
+    assert file_contents == [README.encode()]
+    assert messages[-1]["more_body"] is False
+    assert messages[-1]["file"].closed
+
+    messages.clear()
+    file_contents.clear()
+    await FileResponse(readme_file, zero_copy=True)({**scope, "headers": [(b"range", b"bytes=0-9")]}, receive, send)
+    assert messages[0]["status"] == 206
+    assert messages[1]["offset"] == 0
+    assert messages[1]["count"] == 10
+    assert file_contents == [README.encode()[:10]]
+
+    messages.clear()
+    file_contents.clear()
+    await FileResponse(readme_file, zero_copy=True)(
+        {**scope, "headers": [(b"range", b"bytes=0-9,20-29")]}, receive, send
+    )
+    assert [message["type"] for message in messages] == [
+        "http.response.start",
+        "http.response.body",
+        "http.response.zerocopy",
+        "http.response.body",
+        "http.response.body",
+        "http.response.zerocopy",
+        "http.response.body",
+        "http.response.body",
+    ]
+    assert all(message["more_body"] for message in messages[1:-1])
+    assert file_contents == [README.encode()[:10], README.encode()[20:30]]
+
+
+@pytest.mark.anyio
+async def test_file_response_zero_copy_memoryview_fallback(readme_file: Path) -> None:
+    class SmallChunkSizeFileResponse(FileResponse):
+        chunk_size = 200
+
+    bodies: list[bytes | memoryview] = []
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.body":
+            bodies.append(message["body"])
+
+    app = SmallChunkSizeFileResponse(readme_file, zero_copy=True)
+    await app({"type": "http", "method": "GET", "headers": []}, receive, send)
+    assert all(isinstance(body, memoryview) for body in bodies)
+    assert [len(body) for body in bodies] == [200, 200, 126]
+    assert b"".join(bodies) == README.encode()
+
+
+def test_file_response_zero_copy_ranges(readme_file: Path, test_client_factory: TestClientFactory) -> None:
+    client = test_client_factory(FileResponse(readme_file, zero_copy=True))
+    response = client.get("/", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == README.encode()[10:20]
+
+    response = client.get("/", headers={"Range": "bytes=0-4,10-14"})
+    assert response.status_code == 206
+    assert README.encode()[10:15] in response.content
+
+
+def test_file_response_zero_copy_empty_file(tmp_path: Path, test_client_factory: TestClientFactory) -> None:
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    client = test_client_factory(FileResponse(path, zero_copy=True))
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.content == b""
+
+
+@pytest.mark.anyio
+async def test_file_response_adaptive_chunk_size(readme_file: Path) -> None:
+    class SmallChunkSizeFileResponse(FileResponse):
+        chunk_size = 10
+        max_chunk_size = 80
+
+    messages: list[Message] = []
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.body":
+            messages.append(message)
+
+    await SmallChunkSizeFileResponse(readme_file)({"type": "http", "method": "GET", "headers": []}, receive, send)
+    assert [len(message["body"]) for message in messages] == [10, 20, 40, 80, 80, 80, 80, 80, 56]
+    assert [message["more_body"] for message in messages] == [True] * 8 + [False]
+    assert b"".join(message["body"] for message in messages) == README.encode()
+
+    messages.clear()
+    app = SmallChunkSizeFileResponse(readme_file)
+    await app({"type": "http", "method": "GET", "headers": [(b"range", b"bytes=0-4,100-299")]}, receive, send)
+    assert [len(message["body"]) for message in messages[4:9]] == [10, 20, 40, 80, 50]
+    assert all(message["more_body"] for message in messages[:-1])
+    assert b"".join(message["body"] for message in messages[4:9]) == README.encode()[100:300]
+
+
+@pytest.mark.anyio
+async def test_file_response_read_ahead_truncated_file(readme_file: Path) -> None:
+    class SmallChunkSizeFileResponse(FileResponse):
+        chunk_size = 10
+
+    messages: list[Message] = []
+    stat_result = os.stat(readme_file)
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.body":
+            messages.append(message)
+
+    readme_file.write_bytes(README.encode()[:300])
+    app = SmallChunkSizeFileResponse(readme_file, stat_result=stat_result)
+    await app({"type": "http", "method": "GET", "headers": []}, receive, send)
+    assert b"".join(message["body"] for message in messages) == README.encode()[:300]
+    assert messages[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+
+
+def test_file_response_stat_validators_are_cached(readme_file: Path) -> None:
+    stat_result = os.stat(readme_file)
+    first = FileResponse(readme_file, stat_result=stat_result)
+    hits = _stat_validators.cache_info().hits
+    second = FileResponse(readme_file, stat_result=stat_result)
+
+    assert _stat_validators.cache_info().hits == hits + 1
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["last-modified"] == second.headers["last-modified"]
+    assert second.headers["content-length"] == str(len(README.encode()))
+
+
+def test_file_response_stat_cache(
+    readme_file: Path, test_client_factory: TestClientFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    class CachedStatFileResponse(FileResponse):
+        stat_cache_ttl = 60
+
+    stat_calls: list[str] = []
+    original_stat = os.stat
+
+    def counting_stat(path: str) -> os.stat_result:
+        stat_calls.append(path)
+        return original_stat(path)
+
+    monkeypatch.setattr(os, "stat", counting_stat)
+    monkeypatch.setattr("starlette.responses._stat_cache", OrderedDict())
+    monkeypatch.setattr("starlette.responses._STAT_CACHE_SIZE", 1)
+    other_file = readme_file.parent / "other.txt"
+    other_file.write_bytes(b"other")
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        path = other_file if scope["path"] == "/other" else readme_file
+        await CachedStatFileResponse(path)(scope, receive, send)
+
+    client = test_client_factory(app)
+    assert client.get("/").content == README.encode()
+    assert client.get("/").content == README.encode()
+    assert stat_calls == [str(readme_file)]
+
+    assert client.get("/other").content == b"other"
+    assert client.get("/").content == README.encode()
+    assert stat_calls == [str(readme_file), str(other_file), str(readme_file)]
+
+
+def test_file_response_stat_cache_is_lru(
+    readme_file: Path, test_client_factory: TestClientFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    class CachedStatFileResponse(FileResponse):
+        stat_cache_ttl = 60
+
+    stat_calls: list[str] = []
+    original_stat = os.stat
+
+    def counting_stat(path: str) -> os.stat_result:
+        stat_calls.append(path)
+        return original_stat(path)
+
+    monkeypatch.setattr(os, "stat", counting_stat)
+    monkeypatch.setattr("starlette.responses._stat_cache", OrderedDict())
+    monkeypatch.setattr("starlette.responses._STAT_CACHE_SIZE", 2)
+    paths = {name: readme_file.parent / f"{name}.txt" for name in ("one", "two", "three")}
+    for name, path in paths.items():
+        path.write_bytes(name.encode())
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await CachedStatFileResponse(paths[scope["path"].lstrip("/")])(scope, receive, send)
+
+    client = test_client_factory(app)
+    for name in ("one", "two", "one", "three", "one"):
+        assert client.get(f"/{name}").text == name
+    # The hit on "one" made it the most recently used entry, so "two" was evicted instead.
+    assert stat_calls == [str(paths["one"]), str(paths["two"]), str(paths["three"])]
+
+
+def test_file_response_stat_validators_ignore_path_and_inode(tmp_path: Path) -> None:
+    first, second = tmp_path / "first.txt", tmp_path / "second.txt"
+    first.write_bytes(b"same")
+    second.write_bytes(b"same")
+    os.utime(first, ns=(1_700_000_000_123_456_789, 1_700_000_000_123_456_789))
+    os.utime(second, ns=(1_700_000_000_123_456_789, 1_700_000_000_123_456_789))
+
+    response = FileResponse(first, stat_result=os.stat(first))
+    hits = _stat_validators.cache_info().hits
+    other = FileResponse(second, stat_result=os.stat(second))
+    assert _stat_validators.cache_info().hits == hits + 1
+    assert response.headers["etag"] == other.headers["etag"]
+    stat_result = os.stat(first)
+    etag_base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+    assert response.headers["etag"] == f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def test_file_response_stat_cache_expires(
+    readme_file: Path, test_client_factory: TestClientFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    class CachedStatFileResponse(FileResponse):
+        stat_cache_ttl = 0
+
+    monkeypatch.setattr("starlette.responses._stat_cache", OrderedDict())
+    client = test_client_factory(CachedStatFileResponse(readme_file))
+    assert client.get("/").content == README.encode()
+
+    readme_file.write_bytes(b"changed")
+    client = test_client_factory(CachedStatFileResponse(readme_file))
+    response = client.get("/")
+    assert response.content == b"changed"
+    assert response.headers["content-length"] == "7"
+
+
+def test_file_response_if_none_match(file_response_client: TestClient) -> None:
+    etag = file_response_client.get("/").headers["etag"]
+
+    response = file_response_client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert "content-length" not in response.headers
+
+    response = file_response_client.get("/", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert response.status_code == 304
+
+    response = file_response_client.head("/", headers={"If-None-Match": "*"})
+    assert response.status_code == 304
+
+    # If-Modified-Since is ignored when If-None-Match is present.
+    response = file_response_client.get(
+        "/", headers={"If-None-Match": '"other"', "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+    )
+    assert response.status_code == 200
+    assert response.content == README.encode()
+
+
+def test_file_response_if_modified_since(file_response_client: TestClient) -> None:
+    last_modified = file_response_client.get("/").headers["last-modified"]
+
+    response = file_response_client.get("/", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    response = file_response_client.get("/", headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"})
+    assert response.status_code == 200
+
+    response = file_response_client.get("/", headers={"If-Modified-Since": "not a date"})
+    assert response.status_code == 200
+
+
+def test_file_response_if_match(file_response_client: TestClient) -> None:
+    etag = file_response_client.get("/").headers["etag"]
+
+    response = file_response_client.get("/", headers={"If-Match": f'"other", {etag}'})
+    assert response.status_code == 200
+
+    response = file_response_client.get("/", headers={"If-Match": "*"})
+    assert response.status_code == 200
+
+    response = file_response_client.get("/", headers={"If-Match": '"other"'})
+    assert response.status_code == 412
+    assert response.text == "Precondition Failed"
+
+    # Weak entity tags never match with the strong comparison If-Match uses.
+    response = file_response_client.get("/", headers={"If-Match": f"W/{etag}"})
+    assert response.status_code == 412
+
+
+def test_file_response_if_unmodified_since(file_response_client: TestClient) -> None:
+    last_modified = file_response_client.get("/").headers["last-modified"]
+
+    response = file_response_client.get("/", headers={"If-Unmodified-Since": last_modified})
+    assert response.status_code == 200
+
+    response = file_response_client.get("/", headers={"If-Unmodified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"})
+    assert response.status_code == 412
+
+
+def test_file_response_conditional_unsafe_method(readme_file: Path, test_client_factory: TestClientFactory) -> None:
+    client = test_client_factory(FileResponse(readme_file))
+    etag = client.get("/").headers["etag"]
+
+    response = client.post("/", headers={"If-None-Match": etag})
+    assert response.status_code == 412
+
+    response = client.post("/", headers={"If-Match": '"other"'})
+    assert response.status_code == 412
+
+    response = client.post(
+        "/", headers={"If-None-Match": '"other"', "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+    )
+    assert response.status_code == 200
+
+
+def test_file_response_conditional_ignored_for_error_status(
+    readme_file: Path, test_client_factory: TestClientFactory
+) -> None:
+    client = test_client_factory(FileResponse(readme_file, status_code=404))
+    etag = client.get("/").headers["etag"]
+
+    response = client.get("/", headers={"If-None-Match": etag, "If-Match": '"other"'})
+    assert response.status_code == 404
+    assert response.content == README.encode()
+
+
+@pytest.mark.anyio
+async def test_file_response_not_modified_skips_file_io(readme_file: Path) -> None:
+    stat_result = os.stat(readme_file)
+    etag = FileResponse(readme_file, stat_result=stat_result).headers["etag"]
+    readme_file.unlink()
+    messages: list[Message] = []
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    app = FileResponse(readme_file, stat_result=stat_result)
+    await app({"type": "http", "method": "GET", "headers": [(b"if-none-match", etag.encode())]}, receive, send)
+    assert messages[0]["status"] == 304
+    assert messages[1]["body"] == b""
+
+
+@pytest.mark.parametrize("headers", [{"If-None-Match": "*"}, {"If-Match": '"other"'}])
+def test_file_response_conditional_runs_background(
+    headers: dict[str, str], readme_file: Path, test_client_factory: TestClientFactory
+) -> None:
+    tasks: list[str] = []
+    app = FileResponse(readme_file, background=BackgroundTask(tasks.append, "done"))
+
+    response = test_client_factory(app).get("/", headers=headers)
+    assert response.status_code in (304, 412)
+    assert tasks == ["done"]
+
+
+def test_server_sent_event_encoding() -> None:
+    event = ServerSentEvent("first\nsecond\r\nthird", event="update", id="42", retry=1000, comment="hi")
+    assert event.encode() == (b": hi\nid: 42\nevent: update\nretry: 1000\ndata: first\ndata: second\ndata: third\n\n")
+    assert ServerSentEvent().encode() == b"\n"
+    assert ServerSentEvent(comment="a\rb").encode() == b": a\n: b\n\n"
+
+
+@pytest.mark.parametrize("field", ["event", "id"])
+def test_server_sent_event_rejects_line_breaks(field: str) -> None:
+    with pytest.raises(ValueError, match=f"Server-sent event '{field}' must not contain line breaks."):
+        kwargs: dict[str, Any] = {field: "a\nb"}
+        ServerSentEvent("data", **kwargs)
+
+
+def test_event_source_response(test_client_factory: TestClientFactory) -> None:
+    async def events() -> AsyncIterator[ServerSentEvent | str]:
+        yield ServerSentEvent("hello", id="1")
+        yield "world"
+
+    app = EventSourceResponse(events(), headers={"Cache-Control": "no-store"})
+    client = test_client_factory(app)
+    response = client.get("/")
+    assert response.text == "id: 1\ndata: hello\n\ndata: world\n\n"
+    assert response.headers["content-type"] == "text/event-stream; charset=utf-8"
+    assert response.headers["cache-control"] == "no-store"
+    assert response.headers["x-accel-buffering"] == "no"
+
+
+def test_event_source_response_sync_iterator(test_client_factory: TestClientFactory) -> None:
+    app = EventSourceResponse(iter(["a", "b"]), ping_interval=None)
+    client = test_client_factory(app)
+    response = client.get("/")
+    assert response.text == "data: a\n\ndata: b\n\n"
+
+
+def test_event_source_response_last_event_id(test_client_factory: TestClientFactory) -> None:
+    def events(last_event_id: str | None) -> Iterator[ServerSentEvent]:
+        start = 0 if last_event_id is None else int(last_event_id) + 1
+        for i in range(start, 3):
+            yield ServerSentEvent(str(i), id=str(i))
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        response = EventSourceResponse(events)
+        await response(scope, receive, send)
+
+    client = test_client_factory(app)
+    response = client.get("/")
+    assert response.text == "id: 0\ndata: 0\n\nid: 1\ndata: 1\n\nid: 2\ndata: 2\n\n"
+    response = client.get("/", headers={"Last-Event-ID": "1"})
+    assert response.text == "id: 2\ndata: 2\n\n"
+
+
+@pytest.mark.anyio
+async def test_event_source_response_pings_when_idle() -> None:
+    bodies: list[bytes] = []
+    pinged = anyio.Event()
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.body":
+            bodies.append(message["body"])
+            if message["body"] == b": ping\n\n":
+                pinged.set()
+
+    async def events() -> AsyncIterator[str]:
+        yield "a"
+        await pinged.wait()
+        yield "b"
+
+    scope: Scope = {"type": "http", "asgi": {"spec_version": "2.4"}, "headers": []}
+    await EventSourceResponse(events(), ping_interval=0.01)(scope, receive, send)
+    assert bodies[0] == b"data: a\n\n"
+    assert b": ping\n\n" in bodies
+    assert bodies[-2:] == [b"data: b\n\n", b""]
+
+
+@pytest.mark.anyio
+async def test_event_source_responses_share_heartbeat() -> None:
+    # The timer never fires on its own, the test ticks the heartbeat instead.
+    heartbeat = _get_heartbeat(3600)
+    pings: list[int] = []
+    finish = [anyio.Event() for _ in range(3)]
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    def make_send(index: int) -> Send:
+        async def send(message: Message) -> None:
+            if message.get("body") == b": ping\n\n":
+                pings.append(index)
+
+        return send
+
+    async def events(index: int) -> AsyncIterator[str]:
+        yield "start"
+        await finish[index].wait()
+
+    scope: Scope = {"type": "http", "asgi": {"spec_version": "2.4"}, "headers": []}
+    async with anyio.create_task_group() as task_group:
+        # The first response to start hosts the timer.
+        for index in range(3):
+            response = EventSourceResponse(events(index), ping_interval=3600)
+            task_group.start_soon(response, scope, receive, make_send(index))
+            await anyio.wait_all_tasks_blocked()
+        assert len(heartbeat.streams) == 3
+        host = heartbeat.host
+        assert host is next(iter(heartbeat.streams))
+
+        # Streams that sent an event since the previous tick aren't pinged.
+        heartbeat.tick()
+        await anyio.wait_all_tasks_blocked()
+        assert pings == []
+        heartbeat.tick()
+        await anyio.wait_all_tasks_blocked()
+        assert sorted(pings) == [0, 1, 2]
+
+        # The stream hosting the timer ends, and hands it over to another one.
+        finish[0].set()
+        await anyio.wait_all_tasks_blocked()
+        assert len(heartbeat.streams) == 2
+        assert heartbeat.host is not None and heartbeat.host is not host
+        heartbeat.tick()
+        await anyio.wait_all_tasks_blocked()
+        assert sorted(pings) == [0, 1, 1, 2, 2]
+
+        # Streams that don't host the timer leave it running.
+        host = heartbeat.host
+        finish[2].set()
+        await anyio.wait_all_tasks_blocked()
+        assert heartbeat.host is host
+        finish[1].set()
+
+    assert not heartbeat.streams
+    assert heartbeat.host is None
+
+
+@pytest.mark.anyio
+async def test_event_source_response_serializes_pings() -> None:
+    heartbeat = _get_heartbeat(3600)
+    messages: list[bytes] = []
+    sending = False
+    release_send = anyio.Event()
+    next_event = anyio.Event()
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        nonlocal sending
+        assert not sending
+        sending = True
+        if message.get("body") == b"data: a\n\n":
+            await release_send.wait()
+        if message["type"] == "http.response.body":
+            messages.append(message["body"])
+        sending = False
+
+    async def events() -> AsyncIterator[str]:
+        yield "a"
+        await next_event.wait()
+        yield "b"
+
+    scope: Scope = {"type": "http", "asgi": {"spec_version": "2.4"}, "headers": []}
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(EventSourceResponse(events(), ping_interval=3600), scope, receive, send)
+        await anyio.wait_all_tasks_blocked()
+        # A ping is due while the event is still being sent, so it waits for it.
+        heartbeat.tick()
+        heartbeat.tick()
+        await anyio.wait_all_tasks_blocked()
+        assert messages == []
+        release_send.set()
+        await anyio.wait_all_tasks_blocked()
+        assert messages == [b"data: a\n\n", b": ping\n\n"]
+        next_event.set()
+
+    assert messages == [b"data: a\n\n", b": ping\n\n", b"data: b\n\n", b""]
+
+
+@pytest.mark.anyio
+async def test_event_stream_skips_ping_after_event() -> None:
+    messages: list[Message] = []
+
+    async def send(message: Message) -> None:
+        messages.append(message)  # pragma: no cover
+
+    stream = _EventStream(send)
+    async with anyio.create_task_group() as task_group:
+        async with stream.lock:
+            task_group.start_soon(stream.send_ping)
+            await anyio.wait_all_tasks_blocked()
+            stream.idle = False
+
+    assert messages == []
+    assert not stream.ping_pending
+
+
+def test_event_source_response_string_content(test_client_factory: TestClientFactory) -> None:
+    app = EventSourceResponse("hello", ping_interval=None)
+    client = test_client_factory(app)
+    assert client.get("/").text == "data: hello\n\n"
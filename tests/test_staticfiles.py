@@ -1,7 +1,12 @@
+import gzip
+import hashlib
+import io
 import os
 import stat
+import tarfile
 import tempfile
 import time
+import zipfile
 from pathlib import Path
 from typing import Any
 
@@ -9,13 +14,16 @@ import anyio
 import pytest
 
 from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
 from starlette.exceptions import HTTPException
 from starlette.middleware import Middleware
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.responses import FileResponse, Response
 from starlette.routing import Mount
-from starlette.staticfiles import StaticFiles
+from starlette.staticfiles import StaticFiles, precompress
+from starlette.types import Message, Receive, Scope, Send
 from tests.types import TestClientFactory
 
 
@@ -216,6 +224,17 @@ def test_staticfiles_304_with_etag_match(tmpdir: Path, test_client_factory: Test
     assert second_resp.content == b""
 
 
+def test_staticfiles_is_not_modified(tmpdir: Path) -> None:
+    app = StaticFiles(directory=tmpdir)
+    response_headers = Headers({"etag": '"123"', "last-modified": "Thu, 11 Oct 2013 15:30:19 GMT"})
+
+    with pytest.warns(DeprecationWarning):
+        assert app.is_not_modified(response_headers, Headers({"if-none-match": 'W/"123"'}))
+        assert not app.is_not_modified(response_headers, Headers({"if-none-match": '"456"'}))
+        assert app.is_not_modified(response_headers, Headers({"if-modified-since": "Thu, 11 Oct 2013 15:30:19 GMT"}))
+        assert not app.is_not_modified(response_headers, Headers({}))
+
+
 def test_staticfiles_200_with_etag_mismatch(tmpdir: Path, test_client_factory: TestClientFactory) -> None:
     path = os.path.join(tmpdir, "example.txt")
     with open(path, "w") as file:
@@ -601,3 +620,628 @@ def test_staticfiles_relative_directory_symlinks(test_client_factory: TestClient
     response = client.get("/example.txt")
     assert response.status_code == 200
     assert response.text == "123\n"
+
+
+def test_staticfiles_cache_serves_hot_files_from_memory(
+    tmp_path: Path, test_client_factory: TestClientFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (tmp_path / "example.txt").write_bytes(b"<file content>")
+    app = StaticFiles(directory=tmp_path, cache_size=1024, cache_revalidate_interval=60)
+    client = test_client_factory(app)
+
+    response = client.get("/example.txt")
+    assert response.status_code == 200
+    assert response.text == "<file content>"
+    etag = response.headers["etag"]
+    assert app.file_cache_bytes == 14
+
+    def fail(*args: Any) -> Any:
+        raise AssertionError("Should not be called!")  # pragma: no cover
+
+    monkeypatch.setattr(app, "lookup_path", fail)
+    monkeypatch.setattr("starlette.staticfiles._read_file", fail)
+
+    response = client.get("/example.txt")
+    assert response.status_code == 200
+    assert response.text == "<file content>"
+    assert response.headers["etag"] == etag
+    assert response.headers["content-length"] == "14"
+    assert response.headers["content-type"] == "text/plain; charset=utf-8"
+
+    response = client.head("/example.txt")
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["content-length"] == "14"
+
+    response = client.get("/example.txt", headers={"Range": "bytes=1-4"})
+    assert response.status_code == 206
+    assert response.content == b"file"
+    assert response.headers["content-range"] == "bytes 1-4/14"
+
+    response = client.get("/example.txt", headers={"Range": "bytes=1-4, 6-12"})
+    assert response.status_code == 206
+    assert b"file" in response.content
+    assert b"content" in response.content
+
+    response = client.get("/example.txt", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # The cached headers aren't changed by range responses.
+    response = client.get("/example.txt")
+    assert response.status_code == 200
+    assert response.headers["content-length"] == "14"
+    assert "content-range" not in response.headers
+
+
+def test_staticfiles_cache_revalidates(tmp_path: Path, test_client_factory: TestClientFactory) -> None:
+    path = tmp_path / "example.txt"
+    path.write_bytes(b"<file content>")
+    app = StaticFiles(directory=tmp_path, cache_size=1024, cache_revalidate_interval=0)
+    client = test_client_factory(Starlette(routes=[Mount("/", app=app)]))
+
+    response = client.get("/example.txt")
+    assert response.text == "<file content>"
+    response = client.get("/example.txt")
+    assert response.text == "<file content>"
+
+    path.write_bytes(b"<new file content>")
+    os.utime(path, (0, 1))
+    response = client.get("/example.txt")
+    assert response.text == "<new file content>"
+    assert app.file_cache_bytes == 18
+
+    path.unlink()
+    response = client.get("/example.txt")
+    assert response.status_code == 404
+    assert app.file_cache_bytes == 0
+    assert not app.file_cache
+
+
+def test_staticfiles_cache_eviction(tmp_path: Path, test_client_factory: TestClientFactory) -> None:
+    (tmp_path / "one.txt").write_bytes(b"1" * 40)
+    (tmp_path / "two.txt").write_bytes(b"2" * 40)
+    (tmp_path / "three.txt").write_bytes(b"3" * 40)
+    (tmp_path / "large.txt").write_bytes(b"4" * 101)
+    app = StaticFiles(directory=tmp_path, cache_size=100, cache_max_file_size=1000)
+    client = test_client_factory(app)
+
+    client.get("/one.txt")
+    client.get("/two.txt")
+    client.get("/one.txt")
+    client.get("/three.txt")
+    assert list(app.file_cache) == [("one.txt", ()), ("three.txt", ())]
+    assert app.file_cache_bytes == 80
+
+    # Files larger than the whole cache are never cached.
+    response = client.get("/large.txt")
+    assert response.text == "4" * 101
+    assert list(app.file_cache) == [("one.txt", ()), ("three.txt", ())]
+
+
+def test_staticfiles_cache_skips_customized_responses(tmp_path: Path, test_client_factory: TestClientFactory) -> None:
+    (tmp_path / "example.txt").write_bytes(b"<file content>")
+
+    class CustomFileResponse(FileResponse):
+        pass
+
+    class CustomStaticFiles(StaticFiles):
+        def file_response(self, *args: Any, **kwargs: Any) -> Response:
+            return CustomFileResponse(tmp_path / "example.txt")
+
+    class BackgroundStaticFiles(StaticFiles):
+        def file_response(self, *args: Any, **kwargs: Any) -> Response:
+            return FileResponse(tmp_path / "example.txt", background=BackgroundTask(lambda: None))
+
+    for app in (
+        CustomStaticFiles(directory=tmp_path, cache_size=1024),
+        BackgroundStaticFiles(directory=tmp_path, cache_size=1024),
+    ):
+        client = test_client_factory(app)
+        response = client.get("/example.txt")
+        assert response.text == "<file content>"
+        assert not app.file_cache
+
+
+def test_staticfiles_cache_keeps_file_response_headers(tmp_path: Path, test_client_factory: TestClientFactory) -> None:
+    (tmp_path / "example.txt").write_bytes(b"<file content>")
+
+    class CachingStaticFiles(StaticFiles):
+        def file_response(self, *args: Any, **kwargs: Any) -> Response:
+            response = super().file_response(*args, **kwargs)
+            response.headers["cache-control"] = "max-age=3600"
+            return response
+
+    app = CachingStaticFiles(directory=tmp_path, cache_size=1024, cache_revalidate_interval=60)
+    client = test_client_factory(app)
+    client.get("/example.txt")
+    response = client.get("/example.txt")
+    assert response.headers["cache-control"] == "max-age=3600"
+
+
+def test_staticfiles_cache_read_failures(
+    tmp_path: Path, test_client_factory: TestClientFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (tmp_path / "example.txt").write_bytes(b"<file content>")
+    app = StaticFiles(directory=tmp_path, cache_size=1024)
+    client = test_client_factory(app)
+
+    def read_file(path: str) -> bytes:
+        raise PermissionError()
+
+    monkeypatch.setattr("starlette.staticfiles._read_file", read_file)
+    response = client.get("/example.txt")
+    assert response.text == "<file content>"
+    assert not app.file_cache
+
+    # The file changed between `os.stat` and reading it.
+    monkeypatch.setattr("starlette.staticfiles._read_file", lambda path: b"<file")
+    response = client.get("/example.txt")
+    assert response.text == "<file content>"
+    assert not app.file_cache
+
+
+def test_staticfiles_resolves_directories_once(
+    tmp_path: Path, test_client_factory: TestClientFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (tmp_path / "example.txt").write_bytes(b"<file content>")
+    app = StaticFiles(directory=tmp_path)
+    client = test_client_factory(app)
+
+    assert client.get("/example.txt").status_code == 200
+    assert app.resolved_directories == [os.path.realpath(tmp_path)]
+
+    def fail() -> Any:
+        raise AssertionError("Should not be called!")  # pragma: no cover
+
+    monkeypatch.setattr(app, "resolve_directories", fail)
+    assert client.get("/example.txt").status_code == 200
+
+
+def test_staticfiles_lookup_cache(
+    tmp_path: Path, test_client_factory: TestClientFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    app = StaticFiles(directory=tmp_path, lookup_cache_ttl=60)
+    client = test_client_factory(Starlette(routes=[Mount("/", app=app)]))
+
+    assert client.get("/example.txt").status_code == 404
+    (tmp_path / "example.txt").write_bytes(b"<file content>")
+
+    # Missing files are cached as well.
+    assert client.get("/example.txt").status_code == 404
+
+    full_path, stat_result = app.missing_lookup_cache["example.txt"][1:]
+    app.missing_lookup_cache["example.txt"] = (0, full_path, stat_result)
+    assert client.get("/example.txt").status_code == 200
+    assert list(app.lookup_cache) == ["example.txt"]
+    assert not app.missing_lookup_cache
+
+    def fail(path: str) -> Any:
+        raise AssertionError("Should not be called!")  # pragma: no cover
+
+    monkeypatch.setattr(app, "lookup_path", fail)
+    response = client.get("/example.txt")
+    assert response.status_code == 200
+    assert response.text == "<file content>"
+
+
+def test_staticfiles_lookup_cache_is_bounded(
+    tmp_path: Path, test_client_factory: TestClientFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("starlette.staticfiles._LOOKUP_CACHE_SIZE", 2)
+    app = StaticFiles(directory=tmp_path, lookup_cache_ttl=60)
+    client = test_client_factory(Starlette(routes=[Mount("/", app=app)]))
+
+    for name in ("one.txt", "two.txt", "three.txt"):
+        (tmp_path / name).write_bytes(b"<file content>")
+
+    assert client.get("/one.txt").status_code == 200
+    assert client.get("/two.txt").status_code == 200
+    # A hit makes "one.txt" the most recently used entry, so "two.txt" is evicted.
+    assert client.get("/one.txt").status_code == 200
+    assert client.get("/three.txt").status_code == 200
+    assert list(app.lookup_cache) == ["one.txt", "three.txt"]
+
+    # Missing files don't evict the files that were found.
+    for name in ("four.txt", "five.txt", "six.txt"):
+        assert client.get(f"/{name}").status_code == 404
+    assert list(app.lookup_cache) == ["one.txt", "three.txt"]
+    assert list(app.missing_lookup_cache) == ["five.txt", "six.txt"]
+
+
+def test_staticfiles_precompressed(tmp_path: Path, test_client_factory: TestClientFactory) -> None:
+    (tmp_path / "app.js").write_bytes(b"<file content>")
+    (tmp_path / "app.js.gz").write_bytes(gzip.compress(b"<gzip content>", mtime=0))
+    (tmp_path / "app.js.br").write_bytes(b"<brotli content>")
+    (tmp_path / "style.css").write_bytes(b"<css content>")
+    app = StaticFiles(directory=tmp_path, precompressed=True)
+    client = test_client_factory(app)
+
+    response = client.get("/app.js", headers={"Accept-Encoding": "identity"})
+    assert response.content == b"<file content>"
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    etag = response.headers["etag"]
+
+    response = client.get("/app.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"] == "text/javascript; charset=utf-8"
+    assert response.headers["content-length"] == str(os.path.getsize(tmp_path / "app.js.gz"))
+    assert response.content == b"<gzip content>"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] != etag
+    gzip_etag = response.headers["etag"]
+
+    response = client.get("/app.js", headers={"Accept-Encoding": "gzip, deflate, br, zstd"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["content-length"] == "16"
+    assert response.content == b"<brotli content>"
+    assert response.headers["etag"] not in (etag, gzip_etag)
+
+    response = client.get("/app.js", headers={"Accept-Encoding": "gzip, br;q=0.5"})
+    assert response.headers["content-encoding"] == "gzip"
+
+    # Ranges and conditional requests apply to the encoded variant.
+    response = client.get("/app.js", headers={"Accept-Encoding": "br", "Range": "bytes=1-6"})
+    assert response.status_code == 206
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["content-range"] == "bytes 1-6/16"
+    assert response.content == b"brotli"
+    response = client.get("/app.js", headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_etag})
+    assert response.status_code == 304
+    response = client.get("/app.js", headers={"Accept-Encoding": "br", "If-None-Match": gzip_etag})
+    assert response.status_code == 200
+
+    response = client.get("/style.css", headers={"Accept-Encoding": "gzip, br"})
+    assert response.content == b"<css content>"
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+@pytest.mark.parametrize("follow_symlink", [False, True])
+def test_staticfiles_precompressed_symlinks(
+    follow_symlink: bool, tmp_path: Path, test_client_factory: TestClientFactory
+) -> None:
+    statics = tmp_path / "statics"
+    statics.mkdir()
+    (statics / "app.js").write_bytes(b"<file content>")
+    (statics / "inside.gz").write_bytes(gzip.compress(b"<inside content>"))
+    (tmp_path / "outside.gz").write_bytes(gzip.compress(b"<outside content>"))
+    (statics / "app.js.gz").symlink_to(tmp_path / "outside.gz")
+    (statics / "style.css").write_bytes(b"<css content>")
+    (statics / "style.css.gz").symlink_to(statics / "inside.gz")
+    app = StaticFiles(directory=statics, precompressed=True, follow_symlink=follow_symlink)
+    client = test_client_factory(app)
+
+    # Sidecar files follow the same symbolic link rules as the files they belong to.
+    response = client.get("/app.js", headers={"Accept-Encoding": "gzip"})
+    if follow_symlink:
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == b"<outside content>"
+    else:
+        assert "content-encoding" not in response.headers
+        assert response.content == b"<file content>"
+
+    response = client.get("/style.css", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == b"<inside content>"
+
+
+def test_staticfiles_precompressed_index_and_cache(tmp_path: Path, test_client_factory: TestClientFactory) -> None:
+    (tmp_path / "index.html").write_bytes(b"<html>")
+    (tmp_path / "index.html.gz").write_bytes(gzip.compress(b"<gzip html>"))
+    (tmp_path / "index.html.zst").mkdir()
+    app = StaticFiles(directory=tmp_path, html=True, precompressed=True, cache_size=1024, cache_revalidate_interval=60)
+    client = test_client_factory(app)
+
+    for _ in range(2):
+        response = client.get("/", headers={"Accept-Encoding": "zstd, gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == b"<gzip html>"
+
+        response = client.get("/index.html", headers={"Accept-Encoding": "zstd, gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == b"<gzip html>"
+
+        response = client.get("/index.html", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.content == b"<html>"
+
+    assert list(app.file_cache) == [("index.html", ("zstd", "gzip")), ("index.html", ())]
+
+
+def test_precompress(tmp_path: Path) -> None:
+    content = b"<file content>" * 100
+    (tmp_path / "app.js").write_bytes(content)
+    (tmp_path / "small.js").write_bytes(b"<file content>")
+    (tmp_path / "image.png").write_bytes(os.urandom(2048))
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "style.css").write_bytes(content)
+
+    written = precompress(tmp_path)
+    assert sorted(written) == [str(tmp_path / "app.js.gz"), str(tmp_path / "nested" / "style.css.gz")]
+    assert gzip.decompress((tmp_path / "app.js.gz").read_bytes()) == content
+    assert sorted(os.listdir(tmp_path)) == ["app.js", "app.js.gz", "image.png", "nested", "small.js"]
+
+    # Up to date sidecars are skipped, and sidecars are never compressed.
+    assert precompress(tmp_path) == []
+
+    # Sidecars that are no longer useful are removed.
+    (tmp_path / "app.js").write_bytes(os.urandom(2048))
+    os.utime(tmp_path / "app.js", (0, os.path.getmtime(tmp_path / "app.js.gz") + 10))
+    assert precompress(tmp_path) == []
+    assert not (tmp_path / "app.js.gz").exists()
+
+
+def test_precompress_unsupported_encoding(tmp_path: Path) -> None:
+    with pytest.raises(AssertionError, match="Unsupported encoding 'deflate'."):
+        precompress(tmp_path, encodings=["deflate"])
+
+
+def test_staticfiles_fingerprint(tmp_path: Path, test_client_factory: TestClientFactory) -> None:
+    content = b"console.log('hello')"
+    digest = hashlib.sha256(content).hexdigest()
+    (tmp_path / "app.js").write_bytes(content)
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "style.css").write_bytes(b"body {}")
+    app = StaticFiles(directory=tmp_path, fingerprint=True)
+    assert app.manifest == {
+        "app.js": f"app.{digest[:8]}.js",
+        "css/style.css": f"css/style.{hashlib.sha256(b'body {}').hexdigest()[:8]}.css",
+    }
+    client = test_client_factory(app)
+
+    response = client.get(f"/app.{digest[:8]}.js")
+    assert response.status_code == 200
+    assert response.content == content
+    assert response.headers["content-type"] == "text/javascript; charset=utf-8"
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert response.headers["etag"] == f'"{digest}"'
+
+    response = client.get(f"/app.{digest[:8]}.js", headers={"If-None-Match": f'"{digest}"'})
+    assert response.status_code == 304
+
+    response = client.get("/" + app.manifest["css/style.css"])
+    assert response.content == b"body {}"
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+    # The original names are still served, but can change at any time.
+    response = client.get("/app.js")
+    assert response.content == content
+    assert "cache-control" not in response.headers
+    assert response.headers["etag"] != f'"{digest}"'
+
+
+def test_staticfiles_fingerprint_url_for(tmp_path: Path) -> None:
+    (tmp_path / "app.js").write_bytes(b"console.log('hello')")
+    digest = hashlib.sha256(b"console.log('hello')").hexdigest()
+    app = Starlette(routes=[Mount("/static", app=StaticFiles(directory=tmp_path, fingerprint=True), name="static")])
+
+    assert app.url_path_for("static", path="/app.js") == f"/static/app.{digest[:8]}.js"
+    assert app.url_path_for("static", path="missing.js") == "/static/missing.js"
+
+
+def test_fingerprinted_path_only_applies_to_staticfiles() -> None:
+    class OtherApp:
+        async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+            raise NotImplementedError()  # pragma: no cover
+
+        def fingerprinted_path(self, path: str) -> str:
+            raise AssertionError("Should not be called!")  # pragma: no cover
+
+    app = Starlette(routes=[Mount("/static", app=OtherApp(), name="static")])
+    assert app.url_path_for("static", path="/app.js") == "/static/app.js"
+
+
+def test_staticfiles_fingerprint_changed_file(tmp_path: Path, test_client_factory: TestClientFactory) -> None:
+    (tmp_path / "app.js").write_bytes(b"console.log('hello')")
+    app = StaticFiles(directory=tmp_path, fingerprint=True)
+    client = test_client_factory(app)
+
+    (tmp_path / "app.js").write_bytes(b"console.log('changed')")
+    response = client.get("/" + app.manifest["app.js"])
+    assert response.content == b"console.log('changed')"
+    assert "cache-control" not in response.headers
+
+
+def test_staticfiles_fingerprint_precompressed(tmp_path: Path, test_client_factory: TestClientFactory) -> None:
+    content = b"console.log('hello')"
+    digest = hashlib.sha256(content).hexdigest()
+    (tmp_path / "app.js").write_bytes(content)
+    (tmp_path / "app.js.gz").write_bytes(gzip.compress(content))
+    app = StaticFiles(directory=tmp_path, fingerprint=True, precompressed=True, cache_size=1024)
+    client = test_client_factory(app)
+
+    for _ in range(2):
+        response = client.get("/" + app.manifest["app.js"], headers={"Accept-Encoding": "gzip"})
+        assert response.content == content
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == f'"{digest}-gzip"'
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+        response = client.get("/" + app.manifest["app.js"], headers={"Accept-Encoding": "identity"})
+        assert response.headers["etag"] == f'"{digest}"'
+
+        response = client.get("/app.js", headers={"Accept-Encoding": "identity"})
+        assert "cache-control" not in response.headers
+
+
+def test_staticfiles_fingerprint_with_packages(tmp_path: Path) -> None:
+    (tmp_path / "example.txt").write_bytes(b"<file content>")
+    app = StaticFiles(directory=tmp_path, packages=["tests"], fingerprint=True)
+    digest = hashlib.sha256(b"<file content>").hexdigest()
+    assert app.manifest["example.txt"] == f"example.{digest[:8]}.txt"
+
+
+def test_staticfiles_indexed(
+    tmp_path: Path, test_client_factory: TestClientFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (tmp_path / "example.txt").write_bytes(b"<file content>")
+    (tmp_path / "index.html").write_bytes(b"<h1>Hello</h1>")
+    (tmp_path / "404.html").write_bytes(b"<h1>Custom not found page</h1>")
+    (tmp_path / "dir").mkdir()
+    (tmp_path / "dir" / "index.html").write_bytes(b"<h1>Dir</h1>")
+    app = StaticFiles(directory=tmp_path, html=True, indexed=True)
+    client = test_client_factory(app)
+
+    response = client.get("/example.txt")
+    assert response.text == "<file content>"
+    assert app.index is not None
+    assert sorted(app.index) == [".", "404.html", "dir", os.path.join("dir", "index.html"), "example.txt", "index.html"]
+
+    def fail(*args: Any) -> Any:
+        raise AssertionError("Should not be called!")  # pragma: no cover
+
+    monkeypatch.setattr(app, "lookup_path", fail)
+    monkeypatch.setattr("starlette.staticfiles.os.stat", fail)
+
+    (tmp_path / "new.txt").write_bytes(b"<new file content>")
+    for path, status_code, text in [
+        ("/example.txt", 200, "<file content>"),
+        ("/", 200, "<h1>Hello</h1>"),
+        ("/dir/", 200, "<h1>Dir</h1>"),
+        ("/missing.txt", 404, "<h1>Custom not found page</h1>"),
+        # Files added after the index was built aren't served.
+        ("/new.txt", 404, "<h1>Custom not found page</h1>"),
+    ]:
+        response = client.get(path)
+        assert response.status_code == status_code
+        assert response.text == text
+
+    response = client.get("/dir", follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["location"] == "http://testserver/dir/"
+
+
+def test_staticfiles_indexed_packages_and_symlinks(tmp_path: Path, test_client_factory: TestClientFactory) -> None:
+    statics_path = tmp_path / "statics"
+    statics_path.mkdir()
+    (statics_path / "example.txt").write_bytes(b"<file content>")
+    source_path = tmp_path / "source"
+    source_path.mkdir()
+    (source_path / "secret.txt").write_bytes(b"<secret>")
+    (statics_path / "secret.txt").symlink_to(source_path / "secret.txt")
+    (statics_path / "unreadable").symlink_to(statics_path / "unreadable")
+
+    app = StaticFiles(directory=statics_path, packages=["tests"], indexed=True)
+    client = test_client_factory(Starlette(routes=[Mount("/", app=app)]))
+
+    response = client.get("/example.txt")
+    assert response.text == "<file content>"
+    response = client.get("/secret.txt")
+    assert response.status_code == 404
+    assert app.index is not None
+    assert sorted(app.index) == [".", "example.txt"]
+
+
+@pytest.fixture(params=["zip", "tar"])
+def bundle_path(request: pytest.FixtureRequest, tmp_path: Path) -> Path:
+    files = {
+        "example.txt": b"<file content>",
+        "index.html": b"<h1>Hello</h1>",
+        "404.html": b"<h1>Custom not found page</h1>",
+        "css/style.css": b"body {}",
+        "../outside.txt": b"<outside>",
+    }
+    if request.param == "zip":
+        path = tmp_path / "bundle.zip"
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("css/", b"")
+            for name, content in files.items():
+                archive.writestr(name, content)
+    else:
+        path = tmp_path / "bundle.tar"
+        with tarfile.open(path, "w") as archive:
+            directory_info = tarfile.TarInfo("css")
+            directory_info.type = tarfile.DIRTYPE
+            archive.addfile(directory_info)
+            for name, content in files.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                info.mtime = 1_700_000_000
+                archive.addfile(info, io.BytesIO(content))
+    return path
+
+
+def test_staticfiles_bundle(bundle_path: Path, test_client_factory: TestClientFactory) -> None:
+    app = StaticFiles(bundle=bundle_path, html=True)
+    client = test_client_factory(app)
+
+    response = client.get("/example.txt")
+    assert response.status_code == 200
+    assert response.text == "<file content>"
+    assert response.headers["content-type"] == "text/plain; charset=utf-8"
+    assert response.headers["content-length"] == "14"
+    assert response.headers["etag"].endswith('-e"')
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    response = client.get("/example.txt", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    response = client.get("/example.txt", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    response = client.get("/example.txt", headers={"Range": "bytes=1-4"})
+    assert response.status_code == 206
+    assert response.content == b"file"
+    response = client.get("/example.txt", headers={"Range": "bytes=1-4, 6-12"})
+    assert response.status_code == 206
+    assert b"content" in response.content
+
+    response = client.head("/example.txt")
+    assert response.content == b""
+    assert response.headers["content-length"] == "14"
+
+    response = client.get("/css/style.css")
+    assert response.text == "body {}"
+    assert response.headers["etag"] != etag
+
+    response = client.get("/")
+    assert response.text == "<h1>Hello</h1>"
+
+    for path in ("/missing.txt", "/css/", "/outside.txt"):
+        response = client.get(path)
+        assert response.status_code == 404
+        assert response.text == "<h1>Custom not found page</h1>"
+
+
+@pytest.mark.anyio
+async def test_staticfiles_bundle_sends_memoryviews(bundle_path: Path) -> None:
+    app = StaticFiles(bundle=bundle_path)
+    messages: list[Message] = []
+
+    async def receive() -> Message:
+        raise NotImplementedError("Should not be called!")  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/example.txt",
+        "headers": [],
+        "extensions": {"http.response.pathsend": {}},
+    }
+    await app(scope, receive, send)
+    assert messages[0]["status"] == 200
+    assert isinstance(messages[1]["body"], memoryview)
+    assert bytes(messages[1]["body"]) == b"<file content>"
+
+
+def test_staticfiles_bundle_errors(tmp_path: Path) -> None:
+    path = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("example.txt", b"<file content>")
+    with pytest.raises(RuntimeError, match="StaticFiles bundle member 'example.txt' is compressed."):
+        StaticFiles(bundle=path)
+
+    path = tmp_path / "bundle.tar.gz"
+    with tarfile.open(path, "w:gz") as tar_archive:
+        tar_archive.addfile(tarfile.TarInfo("example.txt"), io.BytesIO(b""))
+    with pytest.raises(RuntimeError, match="is not an uncompressed zip or tar archive."):
+        StaticFiles(bundle=path)
+
+    with pytest.raises(AssertionError, match="'bundle' can't be used with 'directory' or 'packages'."):
+        StaticFiles(directory=tmp_path, bundle=path)
+    with pytest.raises(AssertionError, match="'bundle' can't be used with 'precompressed' or 'fingerprint'."):
+        StaticFiles(bundle=path, precompressed=True)